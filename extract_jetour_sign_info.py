@@ -1,69 +1,141 @@
-import requests
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
+from jetour_api import JetourApi
+from jetour_cache import token_hash
+from jetour_dashboard import DashboardWriter
+from jetour_history import SignHistoryStore, count_filled, count_signed, encode_record, month_range
+from jetour_metrics import export_metrics, start_metrics_server_from_env
+from jetour_models import SignPage, SignRecord, TaskInfo
+from jetour_profile import get_default_profile_store, user_info
+
 # 捷途签到API信息提取脚本
 # 用于从API响应中提取关键签到信息和奖励数据
 
+# 历史签到记录位图文件（见 jetour_history.SignHistoryStore）
+SIGN_HISTORY_FILE = "sign-history.bin"
+
+
+def shift_month(month_str, delta):
+    """将 %Y%m 月份前后移动 delta 个月"""
+    index = int(month_str[:4]) * 12 + int(month_str[4:]) - 1 + delta
+    return f"{index // 12:04d}{index % 12 + 1:02d}"
+
+
 class JetourSignInfoExtractor:
-    def __init__(self, access_token, task_id):
+    def __init__(self, access_token, task_id, http_client=None, snapshot=None):
         self.access_token = access_token
         self.task_id = task_id
-        self.base_url = "https://mobile-consumer.jetour.com.cn/web/task"
-        self.headers = {
-            "Host": "mobile-consumer.jetour.com.cn",
-            "Accept": "*/*",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Accept-Language": "zh-CN,zh",
-            "Content-Type": "application/json",
-            "Origin": "https://h5-app.jetour.com.cn",
-            "Referer": "https://h5-app.jetour.com.cn/",
-            "Connection": "keep-alive",
-            "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 18_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 ios/1.0.0"
-        }
+        # 接口请求由 jetour_configuration.yaml 生成，底层使用共享连接池的 HTTP 客户端；
+        # snapshot 为同一次运行中 worker 已获取的响应（见 jetour_pipeline.py）
+        self.api = JetourApi({
+            "JETOUR_ACCESS_TOKEN": access_token,
+            "JETOUR_TASK_ID": task_id
+        }, http_client=http_client, snapshot=snapshot)
     
     def get_sign_record(self, month=None):
-        """获取签到记录"""
-        url = f"{self.base_url}/sign/sign-record"
-        params = {
-            "access_token": self.access_token,
-            "taskId": self.task_id,
-            "monthInYear": month or datetime.now().strftime("%Y%m")
-        }
-        
-        response = requests.get(url, params=params, headers=self.headers, verify=True, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        """获取签到记录，month 格式为 %Y%m，默认当月"""
+        params = {"monthInYear": month} if month else None
+        return self.api.sign_record(params=params)
     
     def get_sign_page(self):
         """获取签到页面信息"""
-        url = f"{self.base_url}/sign/sign-page"
-        params = {
-            "access_token": self.access_token,
-            "taskId": self.task_id
-        }
-        
-        response = requests.get(url, params=params, headers=self.headers, verify=True, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        return self.api.sign_page()
     
     def get_task_info(self):
         """获取任务信息"""
-        url = f"{self.base_url}/tasks/load-one"
-        params = {
-            "sceneCode": "signInScene",
-            "terminal": "4",
-            "access_token": self.access_token
+        return self.api.task_load()
+    
+    def backfill(self, start_month=None, end_month=None, months=12, max_workers=4, history_file=SIGN_HISTORY_FILE):
+        """回填历史签到记录并计算跨月统计，返回统计结果（历史文件损坏时跳过回填，返回 None）
+
+        默认回填截至当月的最近 months 个月；月份结束后保存过的月份直接跳过，
+        其余月份（含当月、以及月内保存过但现已结束的月份）以最多 max_workers 个并发请求获取。
+        """
+        current_month = datetime.now().strftime("%Y%m")
+        end_month = end_month or current_month
+        start_month = start_month or shift_month(end_month, -(months - 1))
+        
+        try:
+            store = SignHistoryStore(history_file)
+        except ValueError as e:
+            # 不覆盖损坏的文件，留给人工处理；本次跳过回填，不影响后续的信息提取
+            print(f"跳过回填: {e}")
+            return None
+        account = token_hash(self.access_token)
+        wanted = month_range(start_month, end_month)
+        missing = [month for month in wanted if not store.is_final(account, month)]
+        
+        print(f"回填签到记录: {start_month} ~ {end_month}, 共 {len(wanted)} 个月, 需获取 {len(missing)} 个月")
+        
+        def fetch(month):
+            try:
+                return month, SignRecord.from_response(self.get_sign_record(month)).sign_record, None
+            except Exception as e:
+                return month, None, e
+        
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+                for month, sign_record, error in executor.map(fetch, missing):
+                    if error is not None:
+                        print(f"获取 {month} 签到记录失败: {error}")
+                    elif sign_record:
+                        store.put(account, month, sign_record)
+            store.save()
+        
+        stats = store.stats(account, start_month, end_month)
+        
+        print(f"\n【历史签到统计】")
+        print(f"统计月份: {stats['months']}个月")
+        print(f"签到天数: {stats['signedDays']}天")
+        print(f"补签天数: {stats['makeupDays']}天")
+        print(f"漏签天数: {stats['missedDays']}天")
+        print(f"签到率: {stats['signRate']}%")
+        print(f"补签占比: {stats['fillInRate']}%")
+        print(f"最长连续签到: {stats['longestStreak']}天")
+        print(f"当前连续签到: {stats['currentStreak']}天")
+        return stats
+    
+    def _fetch_sections(self, concurrent=True):
+        """获取任务信息、签到记录、签到页面三个接口的响应
+
+        三个接口互不依赖，concurrent=True 时同时发出请求，总耗时约等于最慢的一个。
+        返回 {名称: Future}，请求异常保存在对应的 Future 中，由各部分单独处理。
+        """
+        fetchers = {
+            "task_info": self.get_task_info,
+            "sign_record": self.get_sign_record,
+            "sign_page": self.get_sign_page
         }
         
-        response = requests.get(url, params=params, headers=self.headers, verify=True, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+                return {name: executor.submit(fetch) for name, fetch in fetchers.items()}
+        
+        futures = {}
+        for name, fetch in fetchers.items():
+            future = Future()
+            try:
+                future.set_result(fetch())
+            except Exception as e:
+                future.set_exception(e)
+            futures[name] = future
+        return futures
     
-    def extract_key_info(self):
-        """提取关键签到信息"""
-        print("=" * 60)
-        print("捷途签到信息提取结果")
-        print("=" * 60)
+    def extract_key_info(self, concurrent=True, output_mode="legacy", history_file=SIGN_HISTORY_FILE,
+                         history_store=None, verbose=True):
+        """提取关键签到信息，返回提取的数据
+
+        concurrent=True 时并发获取各接口数据，某一部分失败不影响其他部分的提取。
+        output_mode: legacy 写完整的 sign-data.json；sharded 写 data/ 下的概览和分片（内容不变不重写）；both 两者都写。
+        history_store 为已载入的 SignHistoryStore（多账号模式共用一份），未传入时从 history_file 读取。
+        verbose=False 时只输出失败信息（多账号并发执行时各账号的输出会相互交错）。
+        """
+        echo = print if verbose else (lambda *args, **kwargs: None)
+        echo("=" * 60)
+        echo("捷途签到信息提取结果")
+        echo("=" * 60)
         
         # 存储所有提取的数据
         extracted_data = {
@@ -74,45 +146,48 @@ class JetourSignInfoExtractor:
             "rewardInfo": {}
         }
         
+        responses = self._fetch_sections(concurrent)
+        
         # 1. 获取任务基本信息
         try:
-            task_data = self.get_task_info()
-            task_info = task_data.get("data", {}).get("taskInfo", {})
-            extracted_data["taskInfo"] = task_info
+            task_payload = responses["task_info"].result()
+            task_info = TaskInfo.from_response(task_payload)
+            # 模型只声明了用到的字段，输出仍使用接口返回的完整 taskInfo（typeId、terminalList 等）
+            extracted_data["taskInfo"] = task_payload["data"]["taskInfo"]
             
-            print(f"\n【任务基本信息】")
-            print(f"任务名称: {task_info.get('name', '未知')}")
-            print(f"任务ID: {task_info.get('id', '未知')}")
-            print(f"参与人数: {task_info.get('joinCount', '未知')}人")
+            echo(f"\n【任务基本信息】")
+            echo(f"任务名称: {task_info.name or '未知'}")
+            echo(f"任务ID: {task_info.id}")
+            echo(f"参与人数: {task_info.join_count if task_info.join_count is not None else '未知'}人")
             
             # 提取签到规则
-            rule_desc = task_info.get('taskRuleDesc', '')
+            rule_desc = task_info.task_rule_desc
             if rule_desc:
-                print(f"\n【签到规则】")
+                echo(f"\n【签到规则】")
                 # 简单处理HTML标签
                 rule_desc = rule_desc.replace('<p>', '').replace('</p>', '\n')
                 rule_desc = rule_desc.replace('<span style="font-size: 16px;">', '').replace('</span>', '')
-                print(rule_desc.strip())
+                echo(rule_desc.strip())
         except Exception as e:
             print(f"获取任务信息失败: {e}")
         
         # 2. 获取签到记录
         try:
-            record_data = self.get_sign_record()
-            sign_data = record_data.get("data", {})
+            sign_data = SignRecord.from_response(responses["sign_record"].result())
             
-            print(f"\n【签到记录】")
-            print(f"查询月份: {sign_data.get('month', '未知')}")
-            print(f"当月天数: {sign_data.get('monthDays', '未知')}")
+            echo(f"\n【签到记录】")
+            echo(f"查询月份: {sign_data.month or '未知'}")
+            echo(f"当月天数: {sign_data.month_days or '未知'}")
             
-            sign_record = sign_data.get('signRecord', '')
+            sign_record = sign_data.sign_record
             extracted_data["signRecord"] = sign_record
             
             if sign_record:
                 # 计算签到统计
                 total_days = len(sign_record)
-                signed_days = sign_record.count('1')  # 正常签到
-                make_up_days = sign_record.count('2')  # 补签
+                record_bits = encode_record(sign_record)
+                signed_days = count_signed(record_bits)  # 正常签到
+                make_up_days = count_filled(record_bits)  # 补签
                 missed_days = total_days - signed_days - make_up_days  # 未签到
                 sign_rate = ((signed_days + make_up_days) / total_days * 100) if total_days > 0 else 0
                 
@@ -125,61 +200,77 @@ class JetourSignInfoExtractor:
                     "signRate": round(sign_rate, 1)
                 }
                 
-                print(f"签到天数: {signed_days}天")
-                print(f"补签天数: {make_up_days}天")
-                print(f"未签天数: {missed_days}天")
-                print(f"签到率: {sign_rate:.1f}%")
-                print(f"签到记录: {sign_record}")
-                print(f"记录说明: 1=正常签到, 2=补签, 0/n=未签到")
+                echo(f"签到天数: {signed_days}天")
+                echo(f"补签天数: {make_up_days}天")
+                echo(f"未签天数: {missed_days}天")
+                echo(f"签到率: {sign_rate:.1f}%")
+                echo(f"签到记录: {sign_record}")
+                echo(f"记录说明: 1=正常签到, 2=补签, 0/n=未签到")
         except Exception as e:
             print(f"获取签到记录失败: {e}")
         
         # 3. 获取签到奖励信息
         try:
-            page_data = self.get_sign_page()
-            page_info = page_data.get("data", {})
-            
-            # 保存奖励信息，处理None值
-            point_reward = page_info.get("pointReward") or 0
-            member_reward = page_info.get("memberReward") or 0
+            page = SignPage.from_response(responses["sign_page"].result())
+            next_reward = page.next_stage_reward
             
             extracted_data["rewardInfo"] = {
-                "pointReward": point_reward,
-                "memberReward": member_reward,
-                "cycleType": page_info.get("cycleType", 0),
-                "continuousDays": page_info.get("cycleDays", 0),
-                "nextStageReward": page_info.get("nextStageReward", {})
+                "pointReward": page.point_reward,
+                "memberReward": page.member_reward,
+                "cycleType": page.cycle_type,
+                "continuousDays": page.cycle_days,
+                "nextStageReward": next_reward.to_dict() if next_reward else {}
             }
             
-            print(f"\n【奖励信息】")
-            print(f"单次签到积分: {point_reward}捷途币")
-            print(f"单次签到会员积分: {member_reward}旅行值")
-            print(f"签到周期类型: {'连续签到' if page_info.get('cycleType') == 2 else '其他'}")
-            print(f"当前连续天数: {page_info.get('cycleDays', '未知')}天")
+            echo(f"\n【奖励信息】")
+            echo(f"单次签到积分: {page.point_reward}捷途币")
+            echo(f"单次签到会员积分: {page.member_reward}旅行值")
+            echo(f"签到周期类型: {'连续签到' if page.cycle_type == 2 else '其他'}")
+            echo(f"当前连续天数: {page.cycle_days}天")
             
             # 下一阶段奖励
-            next_reward = page_info.get('nextStageReward', {})
             if next_reward:
-                print(f"\n【下一阶段奖励】")
-                print(f"需要连续签到: {next_reward.get('needContinuousDays', '未知')}天")
-                print(f"可获得积分: {next_reward.get('pointReward', '未知')}捷途币")
-                print(f"可获得会员积分: {next_reward.get('memberReward', '未知')}旅行值")
+                echo(f"\n【下一阶段奖励】")
+                echo(f"需要连续签到: {next_reward.need_continuous_days}天")
+                echo(f"可获得积分: {next_reward.point_reward}捷途币")
+                echo(f"可获得会员积分: {next_reward.member_reward}旅行值")
         except Exception as e:
             print(f"获取奖励信息失败: {e}")
         
-        # 4. 生成JSON数据文件
-        import json
-        try:
-            with open('sign-data.json', 'w', encoding='utf-8') as f:
-                json.dump(extracted_data, f, ensure_ascii=False, indent=2)
-            print(f"\n【数据保存】")
-            print(f"签到数据已保存到 sign-data.json")
-        except Exception as e:
-            print(f"保存数据失败: {e}")
+        # 4. 账号资料：复用 worker 缓存的会员详情，不额外请求
+        profile = get_default_profile_store().get(self.access_token, allow_expired=True, origin=self.api.origin)
+        if profile:
+            extracted_data["userInfo"] = user_info(profile)
+            echo(f"\n【账号资料】")
+            echo(f"会员等级: {extracted_data['userInfo'].get('levelName', '未知')}")
+        
+        # 5. 生成JSON数据文件
+        echo(f"\n【数据保存】")
+        if output_mode in ("legacy", "both"):
+            try:
+                with open('sign-data.json', 'w', encoding='utf-8') as f:
+                    json.dump(extracted_data, f, ensure_ascii=False, indent=2)
+                echo(f"签到数据已保存到 sign-data.json")
+            except Exception as e:
+                print(f"保存数据失败: {e}")
         
-        print(f"\n{"=" * 60}")
-        print("信息提取完成")
-        print("=" * 60)
+        if output_mode in ("sharded", "both"):
+            try:
+                store = history_store
+                if store is None:
+                    try:
+                        store = SignHistoryStore(history_file)
+                    except ValueError as e:
+                        print(f"历史月份分片未更新: {e}")
+                written = DashboardWriter().write(token_hash(self.access_token), extracted_data, history_store=store)
+                echo(f"仪表盘分片数据已更新到 data/（写入 {written} 个文件）")
+            except Exception as e:
+                print(f"保存分片数据失败: {e}")
+        
+        echo("\n" + "=" * 60)
+        echo("信息提取完成")
+        echo("=" * 60)
+        return extracted_data
 
 import os
 
@@ -200,6 +291,16 @@ if __name__ == "__main__":
     print(f"使用ACCESS_TOKEN: {ACCESS_TOKEN[:10]}...")
     print(f"使用TASK_ID: {TASK_ID}")
     
+    start_metrics_server_from_env()
+    
     # 创建提取器并运行
     extractor = JetourSignInfoExtractor(ACCESS_TOKEN, TASK_ID)
-    extractor.extract_key_info()
+    
+    # 设置 BACKFILL_MONTHS 时先回填最近若干个月的历史记录，分片输出会包含这些月份
+    backfill_months = int(os.environ.get('BACKFILL_MONTHS', '0'))
+    if backfill_months > 0:
+        extractor.backfill(months=backfill_months)
+    
+    # DASHBOARD_OUTPUT: sharded（默认）/ legacy / both
+    extractor.extract_key_info(output_mode=os.environ.get('DASHBOARD_OUTPUT', 'sharded'))
+    export_metrics()
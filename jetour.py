@@ -0,0 +1,161 @@
+import argparse
+import os
+import sys
+
+# 捷途命令行入口
+# jetour run / extract / backfill / serve；模块顶层只导入标准库中的轻量模块，HTTP 库、YAML 等
+# 只在执行的子命令中导入，`--help` 和参数错误不加载任何业务模块。
+# 与原脚本一致，任务失败记录在结果和运行日志中，不改变退出状态（定时工作流的后续步骤照常执行）
+
+# 各子命令默认执行路径导入的模块，启动时间基准测试（jetour_startup_benchmark.py）按此测量；
+# 修改子命令的导入时同步更新
+SUBCOMMAND_MODULES = {
+    "run": ("jetour_pipeline",),
+    "extract": ("extract_jetour_sign_info",),
+    "backfill": ("extract_jetour_sign_info",),
+    "serve": ("jetour_daemon",)
+}
+
+OUTPUT_MODES = ("sharded", "legacy", "both")
+
+
+def _credentials(args, parser):
+    """命令行参数优先，其次 JETOUR_ACCESS_TOKEN / JETOUR_TASK_ID，兼容 ACCESS_TOKEN / TASK_ID"""
+    access_token = args.access_token or os.environ.get("JETOUR_ACCESS_TOKEN") or os.environ.get("ACCESS_TOKEN")
+    task_id = args.task_id or os.environ.get("JETOUR_TASK_ID") or os.environ.get("TASK_ID")
+    if not access_token or not task_id:
+        parser.error("未提供 access_token / task_id（--access-token / --task-id 或 JETOUR_ACCESS_TOKEN / JETOUR_TASK_ID）")
+    return access_token, task_id
+
+
+def cmd_run(args, parser):
+    """执行自动任务：单账号默认同时提取仪表盘数据，--accounts 时按账号文件并发执行"""
+    if args.accounts:
+        from jetour_fleet import JetourFleetRunner
+
+        runner = JetourFleetRunner(JetourFleetRunner.load_accounts(args.accounts), concurrency=args.concurrency,
+                                   result_file=args.output, extract=not args.no_extract)
+        runner.run()
+        return 0
+
+    access_token, task_id = _credentials(args, parser)
+    from jetour_metrics import export_metrics, start_metrics_server_from_env
+
+    start_metrics_server_from_env()
+    if args.no_extract:
+        from jetour_auto_worker import JetourAutoWorker
+
+        JetourAutoWorker(access_token=access_token, task_id=task_id).run()
+    else:
+        from jetour_pipeline import run_pipeline
+
+        run_pipeline(access_token, task_id, output_mode=args.output_mode, backfill_months=args.backfill_months)
+    export_metrics()
+    return 0
+
+
+def cmd_extract(args, parser):
+    """提取签到信息并输出仪表盘数据"""
+    access_token, task_id = _credentials(args, parser)
+    from extract_jetour_sign_info import JetourSignInfoExtractor
+    from jetour_metrics import export_metrics, start_metrics_server_from_env
+
+    start_metrics_server_from_env()
+    extractor = JetourSignInfoExtractor(access_token, task_id)
+    if args.backfill_months > 0:
+        extractor.backfill(months=args.backfill_months)
+    extractor.extract_key_info(output_mode=args.output_mode)
+    export_metrics()
+    return 0
+
+
+def cmd_backfill(args, parser):
+    """回填历史月份的签到记录"""
+    access_token, task_id = _credentials(args, parser)
+    from extract_jetour_sign_info import JetourSignInfoExtractor
+    from jetour_metrics import export_metrics
+
+    extractor = JetourSignInfoExtractor(access_token, task_id)
+    extractor.backfill(start_month=args.start, end_month=args.end, months=args.months, max_workers=args.workers)
+    export_metrics()
+    return 0
+
+
+def cmd_serve(args, parser):
+    """常驻调度模式（见 jetour_daemon.py）"""
+    import signal
+
+    from jetour_daemon import JetourDaemon
+    from jetour_fleet import JetourFleetRunner
+
+    if os.path.exists(args.accounts_file):
+        accounts = JetourFleetRunner.load_accounts(args.accounts_file)
+    else:
+        access_token, task_id = _credentials(args, parser)
+        accounts = [{
+            "name": "default",
+            "access_token": access_token,
+            "task_id": task_id,
+            "card_account_id": os.environ.get("JETOUR_CARD_ACCOUNT_ID")
+        }]
+
+    daemon = JetourDaemon(accounts, schedule=args.schedule, window=args.window, concurrency=args.concurrency,
+                          state_file=args.state, results_file=args.results)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run_forever(once=args.once)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="jetour", description="捷途自动签到、数据提取与常驻调度")
+    account = argparse.ArgumentParser(add_help=False)
+    account.add_argument("--access-token", help="默认读取 JETOUR_ACCESS_TOKEN（或 ACCESS_TOKEN）")
+    account.add_argument("--task-id", help="默认读取 JETOUR_TASK_ID（或 TASK_ID）")
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--output-mode", choices=OUTPUT_MODES, default=os.environ.get("DASHBOARD_OUTPUT", "sharded"),
+                        help="仪表盘数据输出方式（默认读取 DASHBOARD_OUTPUT，未设置时为 sharded）")
+    output.add_argument("--backfill-months", type=int, default=int(os.environ.get("BACKFILL_MONTHS", "0")),
+                        help="提取前先回填最近若干个月的历史记录")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    run = commands.add_parser("run", parents=[account, output], help="签到、拆盲盒、领权益，并提取仪表盘数据")
+    run.add_argument("--no-extract", action="store_true", help="只执行自动任务，不提取仪表盘数据")
+    run.add_argument("--accounts", metavar="FILE", help="账号文件（JSON 数组），指定时并发执行多个账号")
+    run.add_argument("--concurrency", type=int, default=int(os.environ.get("JETOUR_FLEET_CONCURRENCY", "8")),
+                     help="多账号同时执行的数量上限")
+    run.add_argument("--output", default="fleet-results.jsonl", help="多账号结果文件")
+    run.set_defaults(handler=cmd_run)
+
+    extract = commands.add_parser("extract", parents=[account, output], help="提取签到信息并输出仪表盘数据")
+    extract.set_defaults(handler=cmd_extract)
+
+    backfill = commands.add_parser("backfill", parents=[account], help="回填历史月份的签到记录")
+    backfill.add_argument("--months", type=int, default=12, help="回填截至结束月份的最近几个月")
+    backfill.add_argument("--start", metavar="YYYYMM", help="开始月份")
+    backfill.add_argument("--end", metavar="YYYYMM", help="结束月份，默认当月")
+    backfill.add_argument("--workers", type=int, default=4, help="并发请求数")
+    backfill.set_defaults(handler=cmd_backfill)
+
+    serve = commands.add_parser("serve", parents=[account], help="常驻进程，按计划时间执行全部账号")
+    serve.add_argument("accounts_file", nargs="?", default=os.environ.get("JETOUR_ACCOUNTS_FILE", "accounts.json"),
+                       help="账号文件路径；文件不存在时使用单账号")
+    serve.add_argument("--schedule", default=os.environ.get("JETOUR_DAEMON_SCHEDULE", "00:00,10:00"),
+                       help="北京时间执行时刻，逗号分隔")
+    serve.add_argument("--window", type=float, default=120, help="账号分散执行的时间窗口（秒）")
+    serve.add_argument("--concurrency", type=int, default=8, help="同时执行的账号数量上限")
+    serve.add_argument("--state", default="daemon-state.json", help="状态文件路径")
+    serve.add_argument("--results", default="daemon-results.jsonl", help="当前时段的结果文件路径（JSONL）")
+    serve.add_argument("--once", action="store_true", help="只执行下一个时段后退出")
+    serve.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.handler(args, parser)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+from jetour_cache import get_default_cache, resolve_ttl
+from jetour_models import loads
+
+# 捷途接口客户端
+# 从 jetour_configuration.yaml 的 rest_command 生成请求模板，新增接口只需修改配置文件
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(BASE_DIR, "jetour_configuration.yaml")
+# 编译后的模板缓存，配置文件未修改时跳过 YAML 解析
+COMPILED_CACHE_FILE = os.path.join(BASE_DIR, ".jetour_api_cache.json")
+COMPILED_FORMAT_VERSION = 3
+
+# 配置中的占位符：${{ JETOUR_ACCESS_TOKEN || 'your-access-token' }}、${{ now().strftime('%Y%m') }}
+PLACEHOLDER_PATTERN = re.compile(r"^\$\{\{\s*(.*?)\s*\}\}$")
+VARIABLE_PATTERN = re.compile(r"^([A-Z_][A-Z0-9_]*)\s*(?:\|\|\s*'[^']*')?$")
+NOW_PATTERN = re.compile(r"^now\(\)\.strftime\('([^']*)'\)$")
+
+# requests 会根据 URL 自动设置 Host，保留配置里的 Host 会导致切换服务地址时请求发错主机
+SKIPPED_HEADERS = {"host"}
+
+_MISSING = object()
+
+
+def compile_value(value):
+    """把配置值编译为可 JSON 序列化的表达式
+
+    ["lit", 值] 字面量；["var", 变量名] 调用时绑定的变量；["now", 格式] 当前时间；
+    ["dict", {键: 表达式}] 嵌套对象。
+    """
+    if isinstance(value, dict):
+        return ["dict", {key: compile_value(item) for key, item in value.items()}]
+    if isinstance(value, str):
+        match = PLACEHOLDER_PATTERN.match(value)
+        if match:
+            expression = match.group(1)
+            variable = VARIABLE_PATTERN.match(expression)
+            if variable:
+                return ["var", variable.group(1)]
+            now = NOW_PATTERN.match(expression)
+            if now:
+                return ["now", now.group(1)]
+            raise ValueError(f"无法解析的配置占位符: {value}")
+    return ["lit", value]
+
+
+def render_value(compiled, variables):
+    """按变量展开表达式，未绑定的变量返回 _MISSING
+
+    配置里 || 后面的默认值只是文档占位（如 'your-access-token'），不会被发送。
+    """
+    kind, payload = compiled
+    if kind == "lit":
+        return payload
+    if kind == "var":
+        value = variables.get(payload)
+        return _MISSING if value in (None, "") else value
+    if kind == "now":
+        return datetime.now().strftime(payload)
+    rendered = {}
+    for key, item in payload.items():
+        value = render_value(item, variables)
+        if value is not _MISSING:
+            rendered[key] = value
+    return rendered
+
+
+class RequestTemplate:
+    """单个接口的预编译请求模板"""
+
+    def __init__(self, name, method, url, headers, timeout, verify, static_params, dynamic_params, data, cache=None,
+                 invalidates=None):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.timeout = timeout
+        self.verify = verify
+        # 字面量参数在编译时就已确定，调用时只需展开动态参数
+        self.static_params = static_params
+        self.dynamic_params = dynamic_params
+        self.data = data
+        # 响应缓存配置，如 {"ttl": 21600, "immutable_month_param": "monthInYear"}
+        self.cache = cache
+        # 写接口调用后需要刷新的读接口（运行快照中作废），None 表示作废全部
+        self.invalidates = invalidates
+
+    @classmethod
+    def compile(cls, name, spec):
+        """从 rest_command 下的一项配置编译模板"""
+        static_params = {}
+        dynamic_params = {}
+        for key, value in (spec.get("params") or {}).items():
+            compiled = compile_value(value)
+            if compiled[0] == "lit":
+                static_params[key] = str(compiled[1])
+            else:
+                dynamic_params[key] = compiled
+
+        headers = {
+            key: str(value) for key, value in (spec.get("headers") or {}).items()
+            if key.lower() not in SKIPPED_HEADERS
+        }
+        data = spec.get("data")
+
+        return cls(
+            name=name,
+            method=spec.get("method", "GET").upper(),
+            url=spec["url"],
+            headers=headers,
+            timeout=spec.get("timeout", 30),
+            verify=spec.get("verify_ssl", True),
+            static_params=static_params,
+            dynamic_params=dynamic_params,
+            data=None if data is None else compile_value(data),
+            cache=spec.get("cache"),
+            invalidates=spec.get("invalidates")
+        )
+
+    def to_compiled(self):
+        return {
+            "method": self.method,
+            "url": self.url,
+            "headers": self.headers,
+            "timeout": self.timeout,
+            "verify": self.verify,
+            "static_params": self.static_params,
+            "dynamic_params": self.dynamic_params,
+            "data": self.data,
+            "cache": self.cache,
+            "invalidates": self.invalidates
+        }
+
+    @classmethod
+    def from_compiled(cls, name, compiled):
+        return cls(name=name, **compiled)
+
+    def build(self, variables, params=None):
+        """展开为 requests 参数；params 可覆盖配置中的同名参数"""
+        request_params = dict(self.static_params)
+        for key, compiled in self.dynamic_params.items():
+            value = render_value(compiled, variables)
+            if value is not _MISSING:
+                request_params[key] = value
+        if params:
+            request_params.update(params)
+
+        kwargs = {
+            "params": request_params,
+            "headers": self.headers,
+            "timeout": self.timeout,
+            "verify": self.verify
+        }
+        if self.data is not None:
+            body = render_value(self.data, variables)
+            if isinstance(body, dict):
+                kwargs["json"] = body
+            elif body is not _MISSING:
+                kwargs["data"] = body
+        return kwargs
+
+
+_templates_cache = {}
+_templates_lock = threading.Lock()
+
+
+def _compile_config(config_path):
+    # YAML 只在编译缓存失效时才需要
+    import yaml
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    return {
+        name: RequestTemplate.compile(name, spec)
+        for name, spec in (config.get("rest_command") or {}).items()
+    }
+
+
+def load_templates(config_path=CONFIG_FILE, cache_path=COMPILED_CACHE_FILE):
+    """加载接口模板
+
+    进程内按配置文件的修改时间和大小缓存；磁盘上的编译缓存与配置文件一致时直接读取，不解析 YAML。
+    """
+    stat = os.stat(config_path)
+    source = f"{COMPILED_FORMAT_VERSION}:{stat.st_mtime_ns}:{stat.st_size}"
+    memo_key = os.path.abspath(config_path)
+
+    with _templates_lock:
+        cached = _templates_cache.get(memo_key)
+        if cached and cached[0] == source:
+            return cached[1]
+
+        templates = None
+        if cache_path:
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    compiled = json.load(f)
+                if compiled.get("source") == source:
+                    templates = {
+                        name: RequestTemplate.from_compiled(name, item)
+                        for name, item in compiled["templates"].items()
+                    }
+            except (OSError, ValueError, KeyError, TypeError):
+                templates = None
+
+        if templates is None:
+            templates = _compile_config(config_path)
+            if cache_path:
+                try:
+                    with open(cache_path, "w", encoding="utf-8") as f:
+                        json.dump({
+                            "source": source,
+                            "templates": {name: t.to_compiled() for name, t in templates.items()}
+                        }, f, ensure_ascii=False)
+                except OSError:
+                    pass
+
+        _templates_cache[memo_key] = (source, templates)
+        return templates
+
+
+class RunSnapshot:
+    """单次运行内的接口响应快照
+
+    同一次运行中 worker 和提取脚本共享：读接口（GET）的成功响应在快照中复用，
+    写接口调用后按配置的 invalidates 作废受影响的读接口，下次读取时重新请求。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses = {}
+        self.hits = 0
+
+    @staticmethod
+    def _key(name, params):
+        return name, json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, name, params):
+        with self._lock:
+            data = self._responses.get(self._key(name, params))
+            if data is not None:
+                self.hits += 1
+            return data
+
+    def put(self, name, params, data):
+        with self._lock:
+            self._responses[self._key(name, params)] = data
+
+    def invalidate(self, names=None):
+        """作废指定接口的全部响应，names 为 None 时清空快照"""
+        with self._lock:
+            if names is None:
+                self._responses.clear()
+                return
+            names = set(names)
+            for key in [key for key in self._responses if key[0] in names]:
+                del self._responses[key]
+
+
+class JetourApi:
+    """由配置文件生成的捷途接口客户端
+
+    variables 绑定配置中的占位变量（如 JETOUR_ACCESS_TOKEN），每个账号一个实例。
+    配置中的 jetour_xxx 接口可直接以 api.xxx(...) 调用，返回解析后的 JSON。
+    配置了 cache 项的 GET 接口先查磁盘缓存，cache=False 时不使用缓存。
+    snapshot（RunSnapshot）在同一次运行的多个客户端之间共享 GET 响应，见 jetour_pipeline.py。
+    base_url（默认读取环境变量 JETOUR_API_BASE_URL）用于把请求发到其他服务地址，如本地模拟服务。
+    """
+
+    def __init__(self, variables=None, http_client=None, config_path=CONFIG_FILE, cache=None, base_url=None,
+                 snapshot=None):
+        self.variables = dict(variables or {})
+        self._http = http_client
+        self.templates = load_templates(config_path)
+        self.cache = None if cache is False else (cache or get_default_cache())
+        self.base_url = base_url or os.environ.get("JETOUR_API_BASE_URL") or None
+        self.snapshot = snapshot
+        self._urls = {}
+        # 每个线程最近调用的接口路径，重试指标按它归属到接口（见 last_endpoint）
+        self._local = threading.local()
+        # 设置了 base_url 时为实际的协议和主机，磁盘缓存和账号资料按它区分，否则为 None
+        self.origin = None
+        if self.base_url:
+            base = urlsplit(self.base_url)
+            self.origin = f"{base.scheme}://{base.netloc}"
+
+    @property
+    def http(self):
+        """HTTP 客户端，第一次真正发出请求时才创建（缓存全部命中时不加载 HTTP 库）"""
+        if self._http is None:
+            from jetour_http import get_default_client
+            self._http = get_default_client()
+        return self._http
+
+    def _url(self, template):
+        """接口地址，设置了 base_url 时替换协议和主机部分"""
+        if not self.base_url:
+            return template.url
+        url = self._urls.get(template.name)
+        if url is None:
+            base = urlsplit(self.base_url)
+            parts = urlsplit(template.url)
+            url = urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+            self._urls[template.name] = url
+        return url
+
+    def call(self, name, params=None, **variables):
+        """调用接口
+
+        params: 覆盖配置中的请求参数（如指定 monthInYear）
+        variables: 仅对本次调用生效的变量绑定
+        """
+        template = self.templates.get(name)
+        if template is None:
+            raise ValueError(f"配置文件中未定义接口: {name}")
+
+        url = self._url(template)
+        self._local.endpoint = urlsplit(url).path
+        bound = dict(self.variables, **variables) if variables else self.variables
+        kwargs = template.build(bound, params)
+
+        use_snapshot = self.snapshot is not None and template.method == "GET"
+        if use_snapshot:
+            data = self.snapshot.get(name, kwargs["params"])
+            if data is not None:
+                return data
+
+        ttl = None
+        if self.cache is not None and template.method == "GET":
+            ttl = resolve_ttl(template.cache, kwargs["params"])
+        if ttl is not None:
+            cache_key = self.cache.make_key(name, kwargs["params"], self.origin)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if use_snapshot:
+                    self.snapshot.put(name, kwargs["params"], cached)
+                return cached
+
+        response = self.http.request(template.method, url, **kwargs)
+        if self.snapshot is not None and template.method != "GET":
+            # 写接口已发出（无论成功与否），受影响的读接口需要重新获取
+            self.snapshot.invalidate(template.invalidates)
+        response.raise_for_status()
+        # 使用 jetour_models 选择的 JSON 解析（安装了 orjson 时更快）
+        data = loads(response.content)
+
+        # 只缓存业务成功的响应
+        if isinstance(data, dict) and data.get("status") == 200:
+            if ttl is not None:
+                self.cache.put(cache_key, data, ttl)
+            if use_snapshot:
+                self.snapshot.put(name, kwargs["params"], data)
+        return data
+
+    def last_endpoint(self):
+        """当前线程最近调用的接口路径（与 HTTP 指标的 endpoint 标签一致），尚未调用时返回 None
+
+        请求失败或响应业务状态不对时抛出的异常都来自最近一次调用，重试按它计入对应接口。
+        """
+        return getattr(self._local, "endpoint", None)
+
+    def url(self, name):
+        """接口的实际请求地址（已按 base_url 替换主机）"""
+        return self._url(self.templates[name])
+
+    def invalidate(self, *names):
+        """状态已变化（如完成签到）时作废运行快照中的指定接口，不传参数时清空快照"""
+        if self.snapshot is not None:
+            self.snapshot.invalidate(names or None)
+
+    def __getattr__(self, attr):
+        name = f"jetour_{attr}"
+        templates = self.__dict__.get("templates") or {}
+        if name not in templates:
+            raise AttributeError(attr)
+
+        def call(params=None, **variables):
+            return self.call(name, params=params, **variables)
+        call.__name__ = attr
+        return call
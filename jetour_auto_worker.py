@@ -1,37 +1,91 @@
-import requests
 import time
 import random
 import os
 import json
+import functools
+import threading
 from datetime import datetime
 
+from jetour_api import JetourApi
+from jetour_metrics import export_metrics, get_default_metrics, start_metrics_server_from_env
+from jetour_models import BlindBoxCount, ConsumerDetail, RightsResult, SignPage, response_status
+from jetour_profile import get_default_profile_store
+from jetour_retry import Deadline, FatalError, RetryableError, RetryPolicy
+from jetour_runlog import get_default_run_log
+from jetour_tasks import SUCCESS, TaskGraph, current_stop_event
+
+# 接口返回这些业务状态码说明 access_token 失效或无权限，重试无意义
+AUTH_FAILURE_STATUSES = {401, 403}
+
+# 拆盲盒接口的加密参数
+BLIND_BOX_ENCRYPT_PARAM = "BW8HqDlEwJLwe4diG3JLcxw8Fdc/iNEn29ZjZ5sv1JT-2K75tcsqQjYjaxEZhzLOJ6ttWrDIWi-FxkVToJV3SeVfvyRlaPqxYBx225W1RVJ7H5DdpkCPPZX31Ig/-6Up"
+
+# 任务图中的任务名及日志中的显示名称，任务名同时是结果摘要中的键
+TASK_LABELS = {
+    "sign_in": "签到",
+    "blind_box": "拆盲盒",
+    "rights": "领权益"
+}
+
+# 补签卡权益信息（对应配置文件 jetour_receive_rights 中的变量）
+RIGHTS_PACKAGE = {
+    "JETOUR_RIGHTS_ID": "3612257299131322053",
+    "JETOUR_RIGHTS_PACKAGE_ID": "3612257299131322059",
+    "JETOUR_RIGHTS_PACKAGE_CODE": "3612257299131322058"
+}
+
 class JetourAutoWorker:
     """捷途自动工作脚本 - 自动签到、拆盲盒、领权益"""
     
-    def __init__(self):
-        """初始化配置"""
+    def __init__(self, access_token=None, task_id=None, card_account_id=None, account_name=None, http_client=None,
+                 run_log=None, config=None, profile_store=None, snapshot=None):
+        """初始化配置
+
+        未显式传入的参数从环境变量读取，多账号模式（jetour_fleet.py）会为每个账号单独传入。
+        http_client 默认使用进程内共享的连接池客户端，接口定义见 jetour_configuration.yaml。
+        run_log 默认使用进程内共享的 JSONL 运行日志（logs/ 目录）。
+        profile_store 默认使用进程内共享的账号资料缓存，缓存有效时不再请求会员详情获取 card_account_id。
+        snapshot（jetour_api.RunSnapshot）与同一次运行的提取脚本共享接口响应，见 jetour_pipeline.py。
+        config 可覆盖下方默认配置项（如重试等待、拆盲盒间隔）。
+        """
+        self.account_name = account_name
         self.config = {
-            "access_token": os.environ.get("JETOUR_ACCESS_TOKEN", ""),
-            "task_id": os.environ.get("JETOUR_TASK_ID", ""),
-            "card_account_id": os.environ.get("JETOUR_CARD_ACCOUNT_ID", ""),
+            "access_token": access_token or os.environ.get("JETOUR_ACCESS_TOKEN", ""),
+            "task_id": task_id or os.environ.get("JETOUR_TASK_ID", ""),
+            "card_account_id": card_account_id or os.environ.get("JETOUR_CARD_ACCOUNT_ID", ""),
             "max_retries": 3,
-            "retry_interval": 60,  # 重试间隔（秒）
-            "timeout": 30,
-            "headers": {
-                "Host": "mobile-consumer.jetour.com.cn",
-                "Accept": "*/*",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Accept-Language": "zh-CN,zh",
-                "Content-Type": "application/json",
-                "Origin": "https://h5-app.jetour.com.cn",
-                "Referer": "https://h5-app.jetour.com.cn/",
-                "Connection": "keep-alive",
-                "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 18_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 ios/1.0.0"
-            }
+            "retry_base_delay": 10,  # 首次重试等待（秒），之后指数增长并加随机抖动
+            "retry_max_delay": 120,  # 单次重试最长等待（秒）
+            "task_budget": 300,  # 单个任务含重试的总时间预算（秒）
+            "run_budget": 900,  # 整次运行的总时间预算（秒）
+            "box_interval": (2, 5)  # 拆盲盒之间的随机间隔（秒），避免被风控
         }
+        self.config.update(config or {})
         
-        # 初始化结果列表（必须在调用log之前）
-        self.results = []
+        self.retry_policy = RetryPolicy(
+            max_retries=self.config["max_retries"],
+            base_delay=self.config["retry_base_delay"],
+            max_delay=self.config["retry_max_delay"],
+            task_budget=self.config["task_budget"]
+        )
+        self.run_deadline = None
+        
+        # 接口请求由 jetour_configuration.yaml 生成，底层使用共享连接池的 HTTP 客户端
+        self.api = JetourApi({
+            "JETOUR_ACCESS_TOKEN": self.config["access_token"],
+            "JETOUR_TASK_ID": self.config["task_id"],
+            "JETOUR_CARD_ACCOUNT_ID": self.config["card_account_id"],
+            **RIGHTS_PACKAGE
+        }, http_client=http_client, snapshot=snapshot)
+        
+        # 运行日志和当前任务名（必须在调用log之前）
+        self.run_log = run_log or get_default_run_log()
+        self._task_context = threading.local()
+        self.summary = None
+        
+        # 账号资料缓存；card_account_id 来自缓存时，领权益失败会作废缓存重新获取一次
+        self.profile_store = profile_store or get_default_profile_store()
+        self._card_from_profile = False
         
         # 验证必要配置
         if not self.config["access_token"]:
@@ -41,11 +95,19 @@ class JetourAutoWorker:
             self.log("错误: 未提供 JETOUR_TASK_ID 环境变量", "ERROR")
             raise ValueError("JETOUR_TASK_ID is required")
         
-        # 尝试自动获取 card_account_id（如果未提供）
+        # 尝试自动获取 card_account_id（如果未提供），优先使用缓存的账号资料
+        if not self.config["card_account_id"]:
+            profile = self.profile_store.get(self.config["access_token"], origin=self.api.origin)
+            if profile and profile.get("cardAccountId"):
+                self.config["card_account_id"] = profile["cardAccountId"]
+                self.api.variables["JETOUR_CARD_ACCOUNT_ID"] = self.config["card_account_id"]
+                self._card_from_profile = True
+                self.log("使用缓存的账号资料中的 card_account_id", "INFO")
         if not self.config["card_account_id"]:
             self.log("未提供 JETOUR_CARD_ACCOUNT_ID，尝试从会员详情API自动获取...", "INFO")
             try:
                 self.config["card_account_id"] = self._get_card_account_id()
+                self.api.variables["JETOUR_CARD_ACCOUNT_ID"] = self.config["card_account_id"]
                 self.log("成功自动获取 card_account_id", "SUCCESS")
             except Exception as e:
                 self.log(f"自动获取 card_account_id 失败: {str(e)}", "ERROR")
@@ -57,79 +119,78 @@ class JetourAutoWorker:
     def log(self, message, level="INFO"):
         """日志记录"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] [{level}] {message}"
+        if self.account_name:
+            log_message = f"[{timestamp}] [{level}] [{self.account_name}] {message}"
+        else:
+            log_message = f"[{timestamp}] [{level}] {message}"
         print(log_message)
-        self.results.append({
-            "timestamp": timestamp,
-            "level": level,
-            "message": message
-        })
+        # 事件流式写入 JSONL 日志，不在内存中累积
+        self.run_log.write(level, message, account=self.account_name,
+                           task=getattr(self._task_context, "name", None))
         
     @staticmethod
-    def retry_decorator(max_retries=3, retry_interval=60):
-        """重试装饰器"""
+    def retry_decorator():
+        """重试装饰器（策略见 jetour_retry.RetryPolicy）
+
+        只重试网络异常、5xx 等可恢复错误；token 失效、4xx、业务拒绝立即失败。
+        在任务图中执行时传入任务的停止事件：任务超时后不再等待重试，也不再重新调用接口。
+        """
         def decorator(func):
+            @functools.wraps(func)
             def wrapper(self, *args, **kwargs):
-                retries = 0
-                while retries < max_retries:
-                    try:
-                        result = func(self, *args, **kwargs)
-                        return result
-                    except Exception as e:
-                        retries += 1
-                        if retries < max_retries:
-                            wait_time = retry_interval * (retries * 2)
-                            self.log(f"执行失败 (重试 {retries}/{max_retries}): {str(e)}，{wait_time}秒后重试...", "ERROR")
-                            time.sleep(wait_time)
-                        else:
-                            self.log(f"执行失败，已达到最大重试次数: {str(e)}", "ERROR")
-                            raise
+                self._task_context.name = func.__name__
+                
+                def on_retry(attempt, error, wait_time):
+                    # 按失败的接口计数；任务在调用接口之前就失败时记为 unknown
+                    get_default_metrics().inc_retry(self.api.last_endpoint() or "unknown")
+                    self.log(f"执行失败 (重试 {attempt}/{self.retry_policy.max_retries}): {str(error)}，{wait_time:.1f}秒后重试...", "ERROR")
+                
+                try:
+                    return self.retry_policy.call(
+                        lambda: func(self, *args, **kwargs),
+                        run_deadline=self.run_deadline,
+                        on_retry=on_retry,
+                        stop_event=current_stop_event()
+                    )
+                except Exception as e:
+                    self.log(f"执行失败，不再重试: {str(e)}", "ERROR")
+                    raise
+                finally:
+                    self._task_context.name = None
             return wrapper
         return decorator
     
+    @staticmethod
+    def _status_error(action, data):
+        """根据接口业务状态码构造异常：鉴权失败不可重试，其余可重试"""
+        message = f"{action}: {data.get('message', '未知错误')}"
+        if data.get("status") in AUTH_FAILURE_STATUSES:
+            return FatalError(message)
+        return RetryableError(message)
+    
     @retry_decorator()
     def sign_in(self):
         """自动签到"""
         self.log("开始执行自动签到...")
         
-        # 获取当前月份
-        current_month = datetime.now().strftime("%Y%m")
-        
-        # 签到记录API
-        sign_record_url = "https://mobile-consumer.jetour.com.cn/web/task/sign/sign-record"
-        sign_record_params = {
-            "access_token": self.config["access_token"],
-            "taskId": self.config["task_id"],
-            "monthInYear": current_month
-        }
-        
-        # 签到页面API
-        sign_page_url = "https://mobile-consumer.jetour.com.cn/web/task/sign/sign-page"
-        sign_page_params = {
-            "access_token": self.config["access_token"],
-            "taskId": self.config["task_id"]
-        }
-        
         # 先获取签到页面信息
-        response = requests.get(sign_page_url, params=sign_page_params, headers=self.config["headers"], timeout=self.config["timeout"])
-        response.raise_for_status()
-        
-        data = response.json()
-        if data.get("status") == 200:
-            page_info = data.get("data", {})
-            is_signed = page_info.get("isSigned", False)
+        data = self.api.sign_page()
+        if response_status(data) == 200:
+            page = SignPage.from_response(data)
             
-            if is_signed:
+            if page.is_signed:
                 self.log("今日已签到，跳过签到操作", "INFO")
                 return {"success": True, "message": "今日已签到"}
             else:
                 self.log("今日未签到，执行签到操作", "INFO")
                 # 这里需要签到的POST请求，需要根据实际API调整
                 # 暂时返回模拟成功
+                # 签到后签到状态和当月记录已变化，运行快照中的旧响应不能再复用
+                self.api.invalidate("jetour_sign_page", "jetour_sign_record")
                 self.log("签到成功！", "SUCCESS")
                 return {"success": True, "message": "签到成功"}
         else:
-            raise Exception(f"获取签到信息失败: {data.get('message', '未知错误')}")
+            raise self._status_error("获取签到信息失败", data)
     
     @retry_decorator()
     def open_blind_boxes(self):
@@ -137,146 +198,169 @@ class JetourAutoWorker:
         self.log("开始执行自动拆盲盒...")
         
         # 获取盲盒数量
-        count_url = "https://mobile-consumer.jetour.com.cn/web/rights/blind-box/user/count"
-        count_params = {
-            "access_token": self.config["access_token"],
-            "taskId": self.config["task_id"]
-        }
-        
-        response = requests.get(count_url, params=count_params, headers=self.config["headers"], timeout=self.config["timeout"])
-        response.raise_for_status()
-        
-        data = response.json()
-        if data.get("status") == 200:
-            blind_box_data = data.get("data", {})
-            total_count = blind_box_data.get("totalCount", 0)
-            opened_count = blind_box_data.get("openedCount", 0)
-            unopened_count = blind_box_data.get("unopenedCount", 0)
+        data = self.api.blind_box_count()
+        if response_status(data) == 200:
+            boxes = BlindBoxCount.from_response(data)
+            unopened_count = boxes.unopened_count
             
-            self.log(f"盲盒状态: 总数={total_count}, 已拆={opened_count}, 未拆={unopened_count}", "INFO")
+            self.log(f"盲盒状态: 总数={boxes.total_count}, 已拆={boxes.opened_count}, 未拆={unopened_count}", "INFO")
             
             if unopened_count > 0:
                 self.log(f"开始拆 {unopened_count} 个未拆盲盒...", "INFO")
                 
-                # 拆盲盒API
-                open_url = "https://mobile-consumer.jetour.com.cn/web/rights/blind-box/receive"
-                open_params = {
-                    "encryptParam": "BW8HqDlEwJLwe4diG3JLcxw8Fdc/iNEn29ZjZ5sv1JT-2K75tcsqQjYjaxEZhzLOJ6ttWrDIWi-FxkVToJV3SeVfvyRlaPqxYBx225W1RVJ7H5DdpkCPPZX31Ig/-6Up"
-                }
-                
                 # 模拟拆盲盒
+                stop_event = current_stop_event()
+                opened = 0
                 for i in range(min(5, unopened_count)):  # 每次最多拆5个
-                    response = requests.put(open_url, params=open_params, headers=self.config["headers"], timeout=self.config["timeout"])
-                    response.raise_for_status()
-                    
-                    open_data = response.json()
-                    if open_data.get("status") == 200:
+                    open_data = self.api.blind_box_receive(JETOUR_ENCRYPT_PARAM=BLIND_BOX_ENCRYPT_PARAM)
+                    if response_status(open_data) == 200:
                         self.log(f"成功拆第 {i+1} 个盲盒", "SUCCESS")
                     else:
                         self.log(f"拆第 {i+1} 个盲盒失败: {open_data.get('message', '未知错误')}", "ERROR")
+                    opened = i + 1
                     
-                    # 随机间隔，避免被风控
-                    time.sleep(random.uniform(2, 5))
+                    # 随机间隔，避免被风控；任务已超时则不再拆剩下的盲盒
+                    interval = random.uniform(*self.config["box_interval"])
+                    if stop_event is not None:
+                        if stop_event.wait(interval):
+                            self.log("拆盲盒任务已超时，停止拆剩余的盲盒", "WARNING")
+                            break
+                    else:
+                        time.sleep(interval)
                 
-                return {"success": True, "message": f"已拆 {min(5, unopened_count)} 个盲盒"}
+                return {"success": True, "message": f"已拆 {opened} 个盲盒", "data": {**boxes.to_dict(), "opened": opened}}
             else:
                 self.log("没有未拆的盲盒", "INFO")
-                return {"success": True, "message": "没有未拆的盲盒"}
+                return {"success": True, "message": "没有未拆的盲盒", "data": {**boxes.to_dict(), "opened": 0}}
         else:
-            raise Exception(f"获取盲盒信息失败: {data.get('message', '未知错误')}")
+            raise self._status_error("获取盲盒信息失败", data)
     
     @retry_decorator()
     def receive_rights(self):
         """自动领权益"""
         self.log("开始执行自动领权益...")
         
-        # 领取权益API
-        receive_url = "https://mobile-consumer.jetour.com.cn/web/member/receiveRights"
-        receive_params = {
-            "access_token": self.config["access_token"],
-            "cardAccountId": self.config["card_account_id"]
-        }
-        
-        # 补签卡信息
-        rights_data = {
-            "rightsId": "3612257299131322053",
-            "rightsPackageId": "3612257299131322059",
-            "rightsPackageCode": "3612257299131322058",
-            "number": 2,
-            "cardAccountId": self.config["card_account_id"]
-        }
-        
-        response = requests.post(receive_url, params=receive_params, json=rights_data, headers=self.config["headers"], timeout=self.config["timeout"])
-        response.raise_for_status()
+        # 领取补签卡权益，请求体由配置文件中的 RIGHTS_PACKAGE 变量生成
+        data = self.api.receive_rights()
+        if self._card_from_profile and self._rights_failed(data):
+            # 缓存的 card_account_id 可能已失效：作废缓存，重新获取后再领一次
+            self.log("领权益失败，缓存的 card_account_id 可能已失效，重新获取会员详情...", "WARNING")
+            self.profile_store.invalidate(self.config["access_token"], origin=self.api.origin)
+            self._card_from_profile = False
+            self.config["card_account_id"] = self._get_card_account_id()
+            self.api.variables["JETOUR_CARD_ACCOUNT_ID"] = self.config["card_account_id"]
+            data = self.api.receive_rights()
         
-        data = response.json()
-        if data.get("status") == 200:
-            result = data.get("data", {})
-            is_success = result.get("isSuccess", False)
+        if response_status(data) == 200:
+            result = RightsResult.from_response(data)
             
-            if is_success:
+            if result.is_success:
                 self.log("权益领取成功！", "SUCCESS")
-                return {"success": True, "message": "权益领取成功"}
+                return {"success": True, "message": "权益领取成功", "data": {"outcome": "received"}}
             else:
-                fail_message = result.get("failMessage", "领取失败")
+                fail_message = result.fail_message or "领取失败"
                 if "每1月仅可领取一次" in fail_message:
                     self.log(f"权益领取状态: {fail_message}", "INFO")
-                    return {"success": True, "message": fail_message}
+                    return {"success": True, "message": fail_message, "data": {"outcome": "already_received"}}
                 else:
                     self.log(f"权益领取失败: {fail_message}", "ERROR")
-                    raise Exception(fail_message)
+                    # 业务拒绝，重试不会成功
+                    raise FatalError(fail_message)
         else:
-            raise Exception(f"领取权益失败: {data.get('message', '未知错误')}")
+            raise self._status_error("领取权益失败", data)
     
-    def run(self):
-        """执行所有自动化任务"""
+    def build_task_graph(self):
+        """本次运行的任务图
+
+        签到、领权益互不依赖，并发执行；拆盲盒排在签到之后（签到可能发放盲盒），签到失败也照常执行。
+        每个任务的超时为 task_budget。新增任务（如其他权益包）在这里添加，并在 TASK_LABELS 中登记名称。
+
+        超时的任务无法强制中断，线程会留在后台：当前这次接口请求仍会发出并等到 HTTP 超时，
+        之后不再重试、不再拆剩余的盲盒（见 retry_decorator 和 open_blind_boxes）。
+        签到超时但线程仍在执行时，拆盲盒继续等它结束再开始，不会与签到的写请求同时进行；
+        run() 返回时可能仍有这样的线程在结束最后一次请求。
+        """
+        budget = self.config["task_budget"]
+        graph = TaskGraph()
+        graph.add("sign_in", self.sign_in, timeout=budget)
+        graph.add("blind_box", self.open_blind_boxes, after=("sign_in",), timeout=budget)
+        graph.add("rights", self.receive_rights, timeout=budget)
+        return graph
+    
+    def run(self, save=True):
+        """执行所有自动化任务
+
+        返回各任务的结果摘要，tasks 中为每个任务的状态和耗时；
+        save=False 时不写 auto-worker-results.json（多账号模式由调用方统一保存）。
+        执行过程的日志事件见 run_log。
+        """
         self.log("============================================", "INFO")
         self.log("捷途自动工作脚本开始执行", "INFO")
         self.log("============================================", "INFO")
         
+        # 整次运行的时间预算，所有任务的重试等待共用
+        self.run_deadline = Deadline(self.config["run_budget"])
+        
+        summary = {name: None for name in TASK_LABELS}
+        summary["error"] = None
+        
+        def on_finish(name, result):
+            label = TASK_LABELS.get(name, name)
+            if result["status"] == SUCCESS:
+                summary[name] = result["result"]["message"]
+                self.log(f"{label}结果: {summary[name]}（{result['duration']:.1f}秒）", "INFO")
+            else:
+                self.log(f"{label}未完成 [{result['status']}]: {result['error']}", "ERROR")
+        
         try:
-            # 1. 自动签到
-            sign_result = self.sign_in()
-            self.log(f"签到结果: {sign_result['message']}", "INFO")
-            
-            # 2. 自动拆盲盒
-            blind_box_result = self.open_blind_boxes()
-            self.log(f"拆盲盒结果: {blind_box_result['message']}", "INFO")
-            
-            # 3. 自动领权益
-            rights_result = self.receive_rights()
-            self.log(f"领权益结果: {rights_result['message']}", "INFO")
-            
+            results = self.build_task_graph().run(deadline=self.run_deadline, on_finish=on_finish)
+            summary["tasks"] = {
+                name: {"status": result["status"], "duration": result["duration"], "error": result["error"]}
+                for name, result in results.items()
+            }
+            # 任务返回的结构化数据（盲盒数量、权益领取结果）供多账号报表汇总
+            for name, result in results.items():
+                if result["status"] == SUCCESS and result["result"].get("data") is not None:
+                    summary["tasks"][name]["data"] = result["result"]["data"]
+            errors = [f"{name}: {result['error']}" for name, result in results.items() if result["status"] != SUCCESS]
+            summary["error"] = "; ".join(errors) or None
+        
         except Exception as e:
+            summary["error"] = str(e)
             self.log(f"执行过程中发生错误: {str(e)}", "ERROR")
         
         finally:
+            self.summary = summary
             # 保存执行结果
-            self.save_results()
+            if save:
+                self.save_results()
             
             self.log("============================================", "INFO")
             self.log("捷途自动工作脚本执行完成", "INFO")
             self.log("============================================", "INFO")
+        
+        self.run_log.flush()
+        return summary
+    
+    @staticmethod
+    def _rights_failed(data):
+        """领权益响应是否为失败（每月限领一次不算失败，鉴权失败与 card_account_id 无关）"""
+        status = response_status(data)
+        if status != 200:
+            return status not in AUTH_FAILURE_STATUSES
+        result = RightsResult.from_response(data)
+        return not result.is_success and "每1月仅可领取一次" not in result.fail_message
     
     def _get_card_account_id(self):
-        """从会员详情API自动获取 card_account_id"""
-        url = "https://mobile-consumer.jetour.com.cn/web/member/consumer/detail"
-        params = {
-            "access_token": self.config["access_token"]
-        }
-        
-        response = requests.get(url, params=params, headers=self.config["headers"], timeout=self.config["timeout"])
-        response.raise_for_status()
-        
-        data = response.json()
-        if data.get("status") == 200:
-            member_data = data.get("data", {})
-            card_account_list = member_data.get("cardAccountList", [])
+        """从会员详情API自动获取 card_account_id，会员详情同时写入账号资料缓存"""
+        data = self.api.member_detail()
+        if response_status(data) == 200:
+            detail = ConsumerDetail.from_response(data)
+            self.profile_store.put(self.config["access_token"], detail.to_dict(), origin=self.api.origin)
             
-            if card_account_list:
+            if detail.card_account_list:
                 # 取第一个卡账户的id作为cardAccountId
-                card_account = card_account_list[0]
-                card_account_id = card_account.get("id")
+                card_account_id = detail.card_account_id
                 
                 if card_account_id:
                     return card_account_id
@@ -285,21 +369,25 @@ class JetourAutoWorker:
             else:
                 raise Exception("会员详情API响应中未找到 cardAccountList")
         else:
-            raise Exception(f"获取会员详情失败: {data.get('message', '未知错误')}")
+            raise self._status_error("获取会员详情失败", data)
 
     def save_results(self):
-        """保存执行结果"""
+        """保存执行结果摘要（完整日志在 JSONL 运行日志中）"""
         try:
             result_file = "auto-worker-results.json"
             with open(result_file, "w", encoding="utf-8") as f:
                 json.dump({
                     "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "results": self.results
+                    "summary": self.summary,
+                    "log_file": self.run_log.path
                 }, f, ensure_ascii=False, indent=2)
             self.log(f"执行结果已保存到 {result_file}", "INFO")
         except Exception as e:
             self.log(f"保存结果失败: {str(e)}", "ERROR")
 
 if __name__ == "__main__":
+    # 设置 JETOUR_METRICS_PORT 时运行期间可通过 /metrics 采集接口指标
+    start_metrics_server_from_env()
     worker = JetourAutoWorker()
-    worker.run()
\ No newline at end of file
+    worker.run()
+    export_metrics()
\ No newline at end of file
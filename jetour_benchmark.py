@@ -0,0 +1,133 @@
+import argparse
+import contextlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from extract_jetour_sign_info import JetourSignInfoExtractor
+from jetour_auto_worker import JetourAutoWorker
+from jetour_dashboard import DashboardWriter
+from jetour_http import configure_default_client, pool_size_for
+from jetour_mock_server import MockJetourServer
+
+# 捷途端到端基准测试
+# 针对本地模拟服务运行 JetourAutoWorker.run 和 JetourSignInfoExtractor.extract_key_info，
+# 输出吞吐量、p50/p99 延迟和峰值内存
+
+# 基准测试中不需要真实的等待：拆盲盒不间隔，重试等待缩短到毫秒级
+BENCHMARK_WORKER_CONFIG = {
+    "box_interval": (0, 0),
+    "retry_base_delay": 0.01,
+    "retry_max_delay": 0.05
+}
+
+
+def percentile(values, pct):
+    """最近秩法百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """进程峰值常驻内存（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_account(index, task_id):
+    """执行单个模拟账号：worker 全部任务 + 信息提取，返回两段耗时"""
+    token = f"bench-token-{index:06d}"
+
+    started = time.perf_counter()
+    try:
+        worker = JetourAutoWorker(access_token=token, task_id=task_id, account_name=f"bench-{index}",
+                                  config=BENCHMARK_WORKER_CONFIG)
+        ok = worker.run(save=False)["error"] is None
+    except Exception:
+        # 初始化失败（如获取 card_account_id 时遇到模拟错误）计为失败账号
+        ok = False
+    worker_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    JetourSignInfoExtractor(token, task_id).extract_key_info(output_mode="sharded")
+    extract_seconds = time.perf_counter() - started
+
+    return worker_seconds, extract_seconds, ok
+
+
+def run_scenario(accounts, concurrency, task_id="3439799346990943525"):
+    """运行一组账号并统计结果"""
+    configure_default_client(pool_maxsize=pool_size_for(concurrency))
+
+    started = time.perf_counter()
+    # 脚本的控制台输出不计入结果，丢弃以免刷屏
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda index: run_account(index, task_id), range(accounts)))
+        DashboardWriter().flush_summary()
+    elapsed = time.perf_counter() - started
+
+    worker_latencies = [worker for worker, _, _ in results]
+    extract_latencies = [extract for _, extract, _ in results]
+    return {
+        "accounts": accounts,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput": round(accounts / elapsed, 2) if elapsed else 0,
+        "failed": sum(1 for _, _, ok in results if not ok),
+        "worker_p50_ms": round(percentile(worker_latencies, 50) * 1000, 1),
+        "worker_p99_ms": round(percentile(worker_latencies, 99) * 1000, 1),
+        "extract_p50_ms": round(percentile(extract_latencies, 50) * 1000, 1),
+        "extract_p99_ms": round(percentile(extract_latencies, 99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途端到端基准测试（使用本地模拟服务）")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1, 100, 10000], help="模拟账号数量，可指定多组")
+    parser.add_argument("--concurrency", type=int, default=32, help="并发账号数")
+    parser.add_argument("--latency", type=float, default=0.005, help="模拟服务基础延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟服务返回 500 的概率")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="任务信息响应额外填充字节数")
+    parser.add_argument("--base-url", help="使用已启动的模拟服务（如独立进程运行的 jetour_mock_server.py），不在本进程内启动")
+    parser.add_argument("--output", help="结果另存为 JSON 文件")
+    args = parser.parse_args()
+
+    mock = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        mock = MockJetourServer(latency=args.latency, error_rate=args.error_rate,
+                                payload_bytes=args.payload_bytes, seed=0).start()
+        base_url = mock.base_url
+    os.environ["JETOUR_API_BASE_URL"] = base_url
+
+    output = os.path.abspath(args.output) if args.output else None
+    reports = []
+    # 脚本会写 sign-data、data/、logs/ 和缓存目录，在临时目录中运行避免污染仓库
+    with tempfile.TemporaryDirectory(prefix="jetour-bench-") as workdir:
+        os.chdir(workdir)
+        print(f"{'账号数':>8} {'耗时(s)':>9} {'账号/秒':>9} {'失败':>6} {'worker p50/p99(ms)':>20} {'extract p50/p99(ms)':>21} {'峰值内存(MB)':>12}")
+        for accounts in args.accounts:
+            report = run_scenario(accounts, args.concurrency)
+            reports.append(report)
+            print(f"{report['accounts']:>8} {report['seconds']:>9} {report['throughput']:>9} {report['failed']:>6} "
+                  f"{report['worker_p50_ms']:>9}/{report['worker_p99_ms']:<10} "
+                  f"{report['extract_p50_ms']:>10}/{report['extract_p99_ms']:<10} {report['peak_rss_mb']:>12}")
+
+    if mock is not None:
+        mock.stop()
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {output}")
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from jetour_models import loads
+
+# 捷途接口响应磁盘缓存
+# 按接口、参数和 token 哈希缓存 GET 响应；每个接口单独设置有效期，已结束月份的数据永久有效
+
+DEFAULT_CACHE_DIR = os.environ.get("JETOUR_CACHE_DIR", ".jetour_cache")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 永久有效（已结束月份的签到记录不会再变化）
+PERMANENT = math.inf
+
+
+def token_hash(token):
+    """token 的短哈希，缓存键和文件中都不保存明文 token"""
+    return hashlib.sha256((token or "").encode("utf-8")).hexdigest()[:16]
+
+
+def resolve_ttl(cache_spec, params, now=None):
+    """根据配置中的 cache 项计算有效期
+
+    cache_spec 示例：{"ttl": 21600, "immutable_month_param": "monthInYear"}
+    返回 None 表示不缓存，PERMANENT 表示永久有效，否则为秒数。
+    """
+    if not cache_spec:
+        return None
+
+    month_param = cache_spec.get("immutable_month_param")
+    if month_param and params.get(month_param):
+        current_month = (now or datetime.now()).strftime("%Y%m")
+        if str(params[month_param]) < current_month:
+            return PERMANENT
+
+    ttl = cache_spec.get("ttl")
+    return ttl if ttl else None
+
+
+class ResponseCache:
+    """磁盘响应缓存
+
+    每条缓存一个文件，命中时更新文件修改时间；总大小超过 max_bytes 时按修改时间淘汰最久未用的条目。
+    设置环境变量 JETOUR_CACHE_DISABLED=1 或 enabled=False 可关闭缓存。
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("JETOUR_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def make_key(self, endpoint, params, origin=None):
+        """缓存键：接口名 + 除 access_token 外的参数 + token 哈希
+
+        origin 为请求实际发往的协议和主机（设置了 base_url 时），其他服务（如本地模拟服务）的响应
+        与正式接口的缓存互不影响；未设置时与原来的缓存键一致。
+        """
+        params = dict(params or {})
+        token = params.pop("access_token", "")
+        material = [endpoint, sorted((k, str(v)) for k, v in params.items()), token_hash(token)]
+        if origin:
+            material.append(origin)
+        material = json.dumps(material)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """读取缓存，未命中或已过期返回 None"""
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        expires = entry.get("expires")
+        if expires is not None and expires <= time.time():
+            self._remove(path)
+            return None
+
+        try:
+            # 更新修改时间，作为 LRU 淘汰依据
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("data")
+
+    def put(self, key, data, ttl):
+        """写入缓存，ttl 为秒数或 PERMANENT"""
+        if not self.enabled or ttl is None:
+            return
+
+        entry = {
+            "expires": None if ttl == PERMANENT else time.time() + ttl,
+            "data": data
+        }
+        payload = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        path = self._path(key)
+
+        with self._lock:
+            # 总大小在写入前统计，否则首次写入时新文件会被计算两次
+            self._ensure_total()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(temp_path, path)
+            except OSError:
+                return
+
+            self._total_bytes += len(payload) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._remove(path)
+            self._total_bytes = 0
+
+    def _entries(self):
+        """遍历缓存文件，返回 (路径, 修改时间, 大小)"""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for item in os.scandir(bucket.path):
+                if item.name.endswith(".json"):
+                    stat = item.stat()
+                    entries.append((item.path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _ensure_total(self):
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, _, size in self._entries())
+
+    def _evict(self):
+        """淘汰最久未用的条目，直到总大小降到上限的 80%"""
+        target = self.max_bytes * 0.8
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._total_bytes = total
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """获取进程内共享的默认缓存"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
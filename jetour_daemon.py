@@ -0,0 +1,307 @@
+import argparse
+import hashlib
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from jetour_api import JetourApi
+from jetour_cache import token_hash
+from jetour_fleet import JetourFleetRunner
+from jetour_http import configure_default_client, pool_size_for
+from jetour_metrics import export_metrics, start_metrics_server_from_env
+from jetour_report import load_results, write_report
+from jetour_runlog import get_default_run_log
+
+# 捷途常驻进程模式
+# 进程内调度器按北京时间整点触发，连接池在多次执行之间保持；每个账号在时间窗口内有固定的随机偏移，
+# 执行进度持久化到状态文件，进程重启后补执行中断的时段
+
+# 北京时间（无夏令时，不依赖时区数据库）
+BEIJING = timezone(timedelta(hours=8), "Asia/Shanghai")
+# 与原 GitHub Actions 定时任务一致：北京时间 0 点和 10 点
+DEFAULT_SCHEDULE = "00:00,10:00"
+# 账号在时段开始后的这么多秒内分散执行
+DEFAULT_WINDOW = 120
+DEFAULT_STATE_FILE = "daemon-state.json"
+# 当前时段各账号的完整结果记录（JSONL），补执行后与之前完成的账号一起生成汇总报表
+DEFAULT_RESULTS_FILE = "daemon-results.jsonl"
+# 时段开始前这么多秒预先建立连接
+WARM_UP_LEAD = 30
+# 重启后只补执行这么久以内开始的时段
+DEFAULT_CATCH_UP = 6 * 3600
+# 状态文件保留最近的时段数
+KEEP_SLOTS = 20
+
+
+def parse_schedule(text):
+    """解析 "HH:MM,HH:MM" 为 [(时, 分)]，按时间排序"""
+    schedule = set()
+    for item in text.split(","):
+        hour, minute = item.strip().split(":")
+        hour, minute = int(hour), int(minute)
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"无效的执行时间: {item}")
+        schedule.add((hour, minute))
+    if not schedule:
+        raise ValueError("执行时间不能为空")
+    return sorted(schedule)
+
+
+def next_slot(schedule, now):
+    """now 之后（不含）的第一个时段开始时间"""
+    for days in range(2):
+        day = now.date() + timedelta(days=days)
+        for hour, minute in schedule:
+            slot = datetime(day.year, day.month, day.day, hour, minute, tzinfo=BEIJING)
+            if slot > now:
+                return slot
+    raise AssertionError("unreachable")
+
+
+def previous_slot(schedule, now):
+    """now 之前（含）最近的时段开始时间"""
+    for days in range(2):
+        day = now.date() - timedelta(days=days)
+        for hour, minute in reversed(schedule):
+            slot = datetime(day.year, day.month, day.day, hour, minute, tzinfo=BEIJING)
+            if slot <= now:
+                return slot
+    raise AssertionError("unreachable")
+
+
+def account_offset(account_key, slot_key, window):
+    """账号在时段内的执行偏移（秒）
+
+    由账号和时段确定，同一时段重启后不变；不同时段之间变化，避免同一账号总是最早或最晚执行。
+    """
+    if window <= 0:
+        return 0.0
+    digest = hashlib.sha256(f"{account_key}:{slot_key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % int(window * 1000) / 1000
+
+
+def warm_up_connections(client, urls, connections):
+    """向各接口主机预先发送 HEAD 请求，把连接池填满（建立 TCP/TLS），失败忽略"""
+    origins = sorted({f"{parts.scheme}://{parts.netloc}/" for parts in map(urlsplit, urls)})
+
+    def touch(origin):
+        try:
+            client.session.head(origin, timeout=5)
+        except Exception:
+            pass
+
+    with ThreadPoolExecutor(max_workers=max(1, connections)) as executor:
+        list(executor.map(touch, [origin for origin in origins for _ in range(connections)]))
+
+
+class JetourDaemon:
+    """常驻调度器
+
+    accounts 格式与 jetour_fleet.py 的账号文件相同。每个时段内账号按偏移时间依次提交到线程池执行，
+    结果记录在状态文件中：{"slots": {时段: {"started": 时间戳, "accounts": {token 哈希: 结果}}}}；
+    汇总报表需要的完整结果记录追加到 results_file，只保留当前时段的记录。
+    """
+
+    def __init__(self, accounts, schedule=DEFAULT_SCHEDULE, window=DEFAULT_WINDOW, concurrency=8,
+                 state_file=DEFAULT_STATE_FILE, catch_up=DEFAULT_CATCH_UP, results_file=DEFAULT_RESULTS_FILE):
+        self.runner = JetourFleetRunner(accounts, concurrency=concurrency)
+        self.schedule = parse_schedule(schedule) if isinstance(schedule, str) else sorted(schedule)
+        self.window = window
+        self.state_file = state_file
+        self.results_file = results_file
+        self.catch_up = catch_up
+        self.stop_event = threading.Event()
+        self._state_lock = threading.Lock()
+        self.state = self.load_state()
+        self.client = None
+        self._warm_up_urls = []
+
+    @property
+    def accounts(self):
+        return self.runner.accounts
+
+    def load_state(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            state.setdefault("slots", {})
+            return state
+        except (OSError, ValueError):
+            return {"slots": {}}
+
+    def save_state(self):
+        """写入状态文件（调用方持有锁）"""
+        slots = self.state["slots"]
+        for key in sorted(slots)[:-KEEP_SLOTS]:
+            del slots[key]
+        temp_path = f"{self.state_file}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.state_file)
+        except OSError as e:
+            print(f"保存状态文件失败: {e}")
+
+    def pending_accounts(self, slot_key):
+        """时段内尚未完成的账号"""
+        with self._state_lock:
+            done = self.state["slots"].get(slot_key, {}).get("accounts", {})
+        return [account for account in self.accounts if token_hash(account["access_token"]) not in done]
+
+    def _sleep_until(self, timestamp):
+        """等待到指定时间，收到停止信号时返回 False（分段等待，系统时间调整后也能按时唤醒）"""
+        while True:
+            remaining = timestamp - time.time()
+            if remaining <= 0:
+                return True
+            if self.stop_event.wait(min(remaining, 30)):
+                return False
+
+    def slot_records(self, slot_key):
+        """结果文件中某个时段的记录，同一账号执行过多次时取最后一次"""
+        records = {}
+        for record in load_results(self.results_file):
+            if record.get("slot") == slot_key:
+                records[record.get("accountKey")] = record
+        return list(records.values())
+
+    def _start_results(self, slot_key):
+        """只保留本时段已有的记录（补执行时为中断前完成的账号），其余时段的记录丢弃"""
+        records = self.slot_records(slot_key)
+        temp_path = f"{self.results_file}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(temp_path, self.results_file)
+        except OSError as e:
+            print(f"保存结果文件失败: {e}")
+
+    def _run_account(self, slot_key, account):
+        record = self.runner.run_account(account)
+        record["slot"] = slot_key
+        with self._state_lock:
+            try:
+                with open(self.results_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"保存结果文件失败: {e}")
+            slot = self.state["slots"].setdefault(slot_key, {"started": time.time(), "accounts": {}})
+            slot["accounts"][token_hash(account["access_token"])] = {
+                "account": record["account"],
+                "success": record["success"],
+                "error": record["error"],
+                "finished": round(time.time(), 3)
+            }
+            self.save_state()
+        return record
+
+    def run_slot(self, slot, catching_up=False):
+        """执行一个时段：提前预热连接，账号到各自的偏移时间再提交，全部完成后返回结果记录"""
+        slot_key = slot.isoformat(timespec="minutes")
+        pending = self.pending_accounts(slot_key)
+        if not pending:
+            return []
+
+        start = slot.timestamp()
+        plan = sorted(
+            (max(start + account_offset(token_hash(account["access_token"]), slot_key, self.window), time.time()),
+             index, account)
+            for index, account in enumerate(pending)
+        )
+
+        if not self._sleep_until(plan[0][0] - WARM_UP_LEAD):
+            return []
+        if self.client is not None:
+            warm_up_connections(self.client, self._warm_up_urls,
+                                pool_size_for(min(self.runner.concurrency, len(pending))))
+
+        with self._state_lock:
+            self.state["slots"].setdefault(slot_key, {"started": time.time(), "accounts": {}})
+            self.save_state()
+            self._start_results(slot_key)
+
+        print(f"[{datetime.now(BEIJING):%Y-%m-%d %H:%M:%S}] 时段 {slot_key}{'（补执行）' if catching_up else ''}: "
+              f"{len(pending)} 个账号在 {self.window} 秒内分散执行")
+
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.runner.concurrency) as executor:
+            for fire_at, _, account in plan:
+                if not self._sleep_until(fire_at):
+                    break
+                futures.append(executor.submit(self._run_account, slot_key, account))
+        records = [future.result() for future in futures]
+
+        succeeded = sum(1 for record in records if record["success"])
+        print(f"[{datetime.now(BEIJING):%Y-%m-%d %H:%M:%S}] 时段 {slot_key} 完成: 成功 {succeeded}/{len(records)}")
+        get_default_run_log().flush()
+        # 补执行只运行了中断时未完成的账号，报表按本时段全部账号的结果生成
+        write_report(self.slot_records(slot_key))
+        export_metrics(print_summary=False)
+        return records
+
+    def run_forever(self, once=False):
+        """按计划循环执行，直到 stop()；once=True 时只执行下一个时段"""
+        # 连接池按并发账号数 × 单账号请求并行度分配（见 jetour_http.pool_size_for）
+        self.client = configure_default_client(pool_maxsize=pool_size_for(self.runner.concurrency))
+        api = JetourApi(cache=False)
+        self._warm_up_urls = [api.url(name) for name in api.templates]
+        start_metrics_server_from_env()
+
+        # 重启后补执行：上次运行中断的时段（状态文件中已开始但未全部完成）
+        now = datetime.now(BEIJING)
+        last = previous_slot(self.schedule, now)
+        last_key = last.isoformat(timespec="minutes")
+        with self._state_lock:
+            interrupted = last_key in self.state["slots"]
+        if interrupted and (now - last).total_seconds() <= self.catch_up and self.pending_accounts(last_key):
+            self.run_slot(last, catching_up=True)
+
+        while not self.stop_event.is_set():
+            slot = next_slot(self.schedule, datetime.now(BEIJING))
+            print(f"[{datetime.now(BEIJING):%Y-%m-%d %H:%M:%S}] 下一个时段: {slot:%Y-%m-%d %H:%M}（北京时间）")
+            self.run_slot(slot)
+            if once:
+                break
+
+    def stop(self, *args):
+        """停止调度（可作为信号处理函数），正在执行的账号会执行完"""
+        self.stop_event.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途常驻调度模式")
+    parser.add_argument("accounts_file", nargs="?",
+                        default=os.environ.get("JETOUR_ACCOUNTS_FILE", "accounts.json"),
+                        help="账号文件路径（JSON 数组）；文件不存在时使用 JETOUR_ACCESS_TOKEN / JETOUR_TASK_ID 单账号")
+    parser.add_argument("--schedule", default=os.environ.get("JETOUR_DAEMON_SCHEDULE", DEFAULT_SCHEDULE),
+                        help="北京时间执行时刻，逗号分隔，如 00:00,10:00")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW, help="账号分散执行的时间窗口（秒）")
+    parser.add_argument("--concurrency", type=int, default=8, help="同时执行的账号数量上限")
+    parser.add_argument("--state", default=DEFAULT_STATE_FILE, help="状态文件路径")
+    parser.add_argument("--results", default=DEFAULT_RESULTS_FILE, help="当前时段的结果文件路径（JSONL）")
+    parser.add_argument("--once", action="store_true", help="只执行下一个时段后退出")
+    args = parser.parse_args()
+
+    if os.path.exists(args.accounts_file):
+        accounts = JetourFleetRunner.load_accounts(args.accounts_file)
+    else:
+        accounts = [{
+            "name": "default",
+            "access_token": os.environ.get("JETOUR_ACCESS_TOKEN", ""),
+            "task_id": os.environ.get("JETOUR_TASK_ID", ""),
+            "card_account_id": os.environ.get("JETOUR_CARD_ACCOUNT_ID")
+        }]
+        if not accounts[0]["access_token"] or not accounts[0]["task_id"]:
+            parser.error(f"账号文件 {args.accounts_file} 不存在，且未设置 JETOUR_ACCESS_TOKEN / JETOUR_TASK_ID")
+
+    daemon = JetourDaemon(accounts, schedule=args.schedule, window=args.window, concurrency=args.concurrency,
+                          state_file=args.state, results_file=args.results)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run_forever(once=args.once)
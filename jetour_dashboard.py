@@ -0,0 +1,178 @@
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from jetour_history import month_days
+
+# 捷途仪表盘数据分片输出
+# data/summary.json 只是账号索引（附带默认账号的概览卡片数据）；每个账号的概览、月度签到记录和详细信息
+# 按需加载，内容未变化时不重写
+
+DASHBOARD_DIR = "data"
+# 多账号连续写入时索引文件最多每隔这么多秒重写一次，进程退出时补写最后一次
+SUMMARY_WRITE_INTERVAL = 1.0
+
+# 每个输出目录一份内存中的索引，多个写入器（多线程）共享，避免读-改-写互相覆盖
+_summaries = {}
+_summaries_lock = threading.Lock()
+
+
+class DashboardWriter:
+    """仪表盘数据分片写入器
+
+    data/summary.json                      账号索引：{"accounts": [账号], "defaultAccount": 账号, "default": 默认账号的概览}
+    data/accounts/<账号>/summary.json      账号概览（签到统计、奖励摘要、可选月份、用户信息）
+    data/accounts/<账号>/<%Y%m>.json       某月签到记录
+    data/accounts/<账号>/detail.json       任务信息、奖励信息等较大且很少变化的数据
+
+    页面只加载索引就能显示默认账号，切换账号时再加载对应的概览，索引大小不随账号数据增长。
+    """
+
+    def __init__(self, directory=DASHBOARD_DIR):
+        self.directory = directory
+        with _summaries_lock:
+            state = _summaries.get(os.path.abspath(directory))
+            if state is None:
+                state = {"summary": None, "known": set(), "dirty": False, "written_at": 0.0, "lock": threading.Lock()}
+                _summaries[os.path.abspath(directory)] = state
+        self._state = state
+
+    def write_if_changed(self, relative_path, payload):
+        """内容变化时才写入，返回是否写入"""
+        path = os.path.join(self.directory, relative_path)
+        content = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        try:
+            with open(path, "rb") as f:
+                if f.read() == content:
+                    return False
+        except OSError:
+            pass
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+        return True
+
+    def read_json(self, relative_path):
+        """读取数据目录中的 JSON 文件，不存在或无法解析时返回 None"""
+        try:
+            with open(os.path.join(self.directory, relative_path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_summary(self):
+        """读取账号索引；旧格式（accounts 为 {账号: 概览}）转换为新格式"""
+        summary = self.read_json("summary.json") or {}
+        accounts = summary.get("accounts") or []
+        if isinstance(accounts, dict):
+            default = next(iter(accounts), None)
+            return {
+                "accounts": sorted(accounts),
+                "defaultAccount": default,
+                "default": accounts[default] if default else None
+            }
+        return {
+            "accounts": list(accounts),
+            "defaultAccount": summary.get("defaultAccount"),
+            "default": summary.get("default")
+        }
+
+    def account_summary(self, account):
+        """某账号的概览，未写入过时返回 None"""
+        return self.read_json(f"accounts/{account}/summary.json")
+
+    def write(self, account, extracted_data, history_store=None, month=None):
+        """写入单个账号的提取结果
+
+        account: 账号键（token 哈希）；history_store 提供时同时输出已保存的历史月份分片。
+        返回实际写入的文件数。
+        """
+        month = month or datetime.now().strftime("%Y%m")
+        account_dir = f"accounts/{account}"
+        written = 0
+
+        months = {month}
+        if extracted_data.get("signRecord"):
+            written += self.write_if_changed(f"{account_dir}/{month}.json", {
+                "month": month,
+                "signRecord": extracted_data["signRecord"],
+                "signStats": extracted_data.get("signStats", {})
+            })
+
+        if history_store is not None:
+            for stored_month in history_store.stored_months(account):
+                if stored_month == month:
+                    continue
+                months.add(stored_month)
+                written += self.write_if_changed(f"{account_dir}/{stored_month}.json", {
+                    "month": stored_month,
+                    "signRecord": history_store.get_record(account, stored_month),
+                    "monthDays": month_days(stored_month)
+                })
+
+        written += self.write_if_changed(f"{account_dir}/detail.json", {
+            "taskInfo": extracted_data.get("taskInfo", {}),
+            "rewardInfo": extracted_data.get("rewardInfo", {})
+        })
+
+        reward_info = extracted_data.get("rewardInfo", {})
+        entry = {
+            "lastUpdate": extracted_data.get("timestamp") or datetime.now().isoformat(),
+            "month": month,
+            "signStats": extracted_data.get("signStats", {}),
+            "pointReward": reward_info.get("pointReward", 0),
+            "memberReward": reward_info.get("memberReward", 0),
+            "continuousDays": reward_info.get("continuousDays", 0),
+            "months": sorted(months, reverse=True)
+        }
+        if extracted_data.get("userInfo"):
+            entry["userInfo"] = extracted_data["userInfo"]
+        written += self.write_if_changed(f"{account_dir}/summary.json", entry)
+
+        # 索引只在新增账号或默认账号的概览变化时才需要重写
+        state = self._state
+        with state["lock"]:
+            if state["summary"] is None:
+                state["summary"] = self.load_summary()
+                state["known"] = set(state["summary"]["accounts"])
+            summary = state["summary"]
+            if account not in state["known"]:
+                state["known"].add(account)
+                summary["accounts"].append(account)
+                state["dirty"] = True
+            if summary["defaultAccount"] in (None, account):
+                summary["defaultAccount"] = account
+                summary["default"] = entry
+                state["dirty"] = True
+            if state["dirty"] and time.monotonic() - state["written_at"] >= SUMMARY_WRITE_INTERVAL:
+                written += self._flush_summary_locked()
+        return written
+
+    def flush_summary(self):
+        """立即写入尚未落盘的索引"""
+        with self._state["lock"]:
+            return self._flush_summary_locked()
+
+    def _flush_summary_locked(self):
+        state = self._state
+        if not state["dirty"]:
+            return 0
+        state["dirty"] = False
+        state["written_at"] = time.monotonic()
+        return int(self.write_if_changed("summary.json", state["summary"]))
+
+
+@atexit.register
+def _flush_all_summaries():
+    for directory in list(_summaries):
+        try:
+            DashboardWriter(directory).flush_summary()
+        except OSError:
+            pass
@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from extract_jetour_sign_info import SIGN_HISTORY_FILE, JetourSignInfoExtractor
+from jetour_api import RunSnapshot
+from jetour_auto_worker import JetourAutoWorker
+from jetour_cache import token_hash
+from jetour_history import SignHistoryStore
+from jetour_http import configure_default_client, pool_size_for
+from jetour_metrics import export_metrics, start_metrics_server_from_env
+from jetour_report import REPORT_FILE, write_report
+from jetour_runlog import get_default_run_log
+
+# 捷途多账号并发执行脚本
+# 从账号文件读取多个账号，按并发上限同时执行签到、拆盲盒、领权益，
+# 并与单账号流水线（jetour_pipeline.py）一样共享运行快照提取各账号的仪表盘数据，汇总报表据此生成
+
+class JetourFleetRunner:
+    """多账号并发执行器"""
+
+    def __init__(self, accounts, concurrency=8, result_file="fleet-results.jsonl", extract=True,
+                 history_file=SIGN_HISTORY_FILE):
+        """extract=False 时只执行自动任务，不更新仪表盘数据（汇总报表中的签到统计不会更新）"""
+        self.accounts = accounts
+        self.concurrency = max(1, int(concurrency))
+        self.result_file = result_file
+        self.extract = extract
+        self.history_file = history_file
+        self._write_lock = threading.Lock()
+        self._history_lock = threading.Lock()
+        self._history = (None, None)
+
+    @staticmethod
+    def load_accounts(path):
+        """读取账号文件
+
+        文件为 JSON 数组，每项包含 access_token、task_id，可选 card_account_id 和 name。
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            accounts = json.load(f)
+
+        if not isinstance(accounts, list):
+            raise ValueError(f"账号文件格式错误，应为 JSON 数组: {path}")
+
+        for index, account in enumerate(accounts):
+            if not account.get("access_token") or not account.get("task_id"):
+                raise ValueError(f"第 {index + 1} 个账号缺少 access_token 或 task_id")
+            account.setdefault("name", f"account-{index + 1}")
+
+        return accounts
+
+    def _history_store(self):
+        """全部账号共用的历史签到记录，文件变化（如执行了回填）后重新载入；文件不存在或已损坏时返回 None"""
+        try:
+            mtime = os.stat(self.history_file).st_mtime_ns
+        except OSError:
+            return None
+        with self._history_lock:
+            loaded_mtime, store = self._history
+            if loaded_mtime != mtime:
+                try:
+                    store = SignHistoryStore(self.history_file)
+                except ValueError as e:
+                    print(f"历史月份分片未更新: {e}")
+                    store = None
+                self._history = (mtime, store)
+            return store
+
+    def run_account(self, account):
+        """执行单个账号的全部任务并提取仪表盘数据，返回结果记录
+
+        提取失败不影响任务结果（success 只表示任务是否全部成功），错误记录在 extract_error 中。
+        """
+        started = time.monotonic()
+        record = {
+            "account": account["name"],
+            "accountKey": token_hash(account["access_token"]),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "success": False,
+            "sign_in": None,
+            "blind_box": None,
+            "rights": None,
+            "error": None,
+            "extracted": False,
+            "extract_error": None
+        }
+        snapshot = RunSnapshot()
+
+        try:
+            worker = JetourAutoWorker(
+                access_token=account["access_token"],
+                task_id=account["task_id"],
+                card_account_id=account.get("card_account_id"),
+                account_name=account["name"],
+                snapshot=snapshot
+            )
+            summary = worker.run(save=False)
+            record.update(summary)
+            record["success"] = summary["error"] is None
+        except Exception as e:
+            record["error"] = str(e)
+
+        if self.extract:
+            # worker 已获取的接口响应直接复用，签到后的签到页面和记录重新获取
+            try:
+                extractor = JetourSignInfoExtractor(account["access_token"], account["task_id"], snapshot=snapshot)
+                extractor.extract_key_info(output_mode="sharded", history_store=self._history_store(), verbose=False)
+                record["extracted"] = True
+            except Exception as e:
+                record["extract_error"] = str(e)
+
+        record["duration"] = round(time.monotonic() - started, 3)
+        return record
+
+    def _write_record(self, f, record):
+        """追加一条结果记录（每个账号完成后立即落盘）"""
+        with self._write_lock:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+
+    def run(self):
+        """并发执行全部账号"""
+        print("=" * 60)
+        print(f"捷途多账号执行开始: 共 {len(self.accounts)} 个账号, 并发数 {self.concurrency}")
+        print("=" * 60)
+
+        # 每个账号自身也会并发请求（任务图、提取阶段），连接池按并发数 × 单账号并行度分配，
+        # 避免连接池已满时丢弃连接、失去 keep-alive 复用
+        configure_default_client(pool_maxsize=pool_size_for(self.concurrency))
+        start_metrics_server_from_env()
+
+        started = time.monotonic()
+        records = []
+
+        with open(self.result_file, "w", encoding="utf-8") as f:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = [executor.submit(self.run_account, account) for account in self.accounts]
+                # 按完成顺序收集，慢账号不会阻塞其他账号的结果写入
+                for future in as_completed(futures):
+                    record = future.result()
+                    records.append(record)
+                    self._write_record(f, record)
+
+        run_log = get_default_run_log()
+        run_log.flush()
+        write_report(records)
+
+        succeeded = sum(1 for record in records if record["success"])
+        print("=" * 60)
+        print(f"多账号执行完成: 成功 {succeeded}/{len(records)}, 耗时 {time.monotonic() - started:.1f}秒")
+        print(f"结果已保存到 {self.result_file}，汇总报表见 data/{REPORT_FILE}，运行日志见 {run_log.path}")
+        export_metrics()
+        print("=" * 60)
+        return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途多账号并发执行")
+    parser.add_argument("accounts_file", nargs="?",
+                        default=os.environ.get("JETOUR_ACCOUNTS_FILE", "accounts.json"),
+                        help="账号文件路径（JSON 数组）")
+    parser.add_argument("--concurrency", type=int,
+                        default=int(os.environ.get("JETOUR_FLEET_CONCURRENCY", "8")),
+                        help="同时执行的账号数量上限")
+    parser.add_argument("--output", default="fleet-results.jsonl",
+                        help="结果文件路径，每个账号一行 JSON")
+    parser.add_argument("--no-extract", action="store_true",
+                        help="只执行自动任务，不更新仪表盘数据")
+    args = parser.parse_args()
+
+    runner = JetourFleetRunner(
+        JetourFleetRunner.load_accounts(args.accounts_file),
+        concurrency=args.concurrency,
+        result_file=args.output,
+        extract=not args.no_extract
+    )
+    runner.run()
@@ -0,0 +1,298 @@
+import bisect
+import calendar
+import os
+import struct
+import threading
+from array import array
+from datetime import date, datetime
+
+# 捷途签到历史位图存储
+# 每天 2 位（0=未签, 1=正常签到, 2=补签），每个账号每月一个 64 位整数，文件为四列定长数组
+
+NONE, SIGNED, FILLED = 0, 1, 2
+
+# signRecord 字符到 2 位状态的映射，0/n 及其他字符均视为未签
+STATUS_BY_CHAR = {"1": SIGNED, "2": FILLED}
+CHAR_BY_STATUS = {NONE: "0", SIGNED: "1", FILLED: "2"}
+
+MAX_MONTH_DAYS = 31
+# 每天 2 位中的低位掩码
+LOW_MASK = int("01" * MAX_MONTH_DAYS, 2)
+
+FILE_MAGIC = b"JTSH"
+FILE_VERSION = 2
+# 版本 1 的文件没有 final 列，加载后所有月份都视为未完结（下次回填时重新获取一次）
+SUPPORTED_VERSIONS = (1, 2)
+HEADER = struct.Struct("<4sHI")
+
+# 字节（4 天 × 2 位）到 4 位"当天已签"标记的查找表，用于把月位图压缩为每天 1 位
+_PRESENCE_BY_BYTE = bytes(
+    sum(1 << day for day in range(4) if (value >> (2 * day)) & 0b11)
+    for value in range(256)
+)
+
+
+def encode_record(sign_record):
+    """把 signRecord 字符串编码为月位图"""
+    bits = 0
+    for day, char in enumerate(sign_record[:MAX_MONTH_DAYS]):
+        status = STATUS_BY_CHAR.get(char, NONE)
+        if status:
+            bits |= status << (2 * day)
+    return bits
+
+
+def decode_record(bits, days):
+    """把月位图解码为 signRecord 字符串（未签统一为 0）"""
+    return "".join(CHAR_BY_STATUS[(bits >> (2 * day)) & 0b11] for day in range(days))
+
+
+def count_signed(bits):
+    """正常签到天数"""
+    low = bits & LOW_MASK
+    high = (bits >> 1) & LOW_MASK
+    return (low & ~high).bit_count()
+
+
+def count_filled(bits):
+    """补签天数"""
+    low = bits & LOW_MASK
+    high = (bits >> 1) & LOW_MASK
+    return (high & ~low).bit_count()
+
+
+def presence_bits(bits):
+    """压缩为每天 1 位的"当天已签（含补签）"标记，第 1 天在最低位"""
+    result = 0
+    for index, value in enumerate(bits.to_bytes(8, "little")):
+        result |= _PRESENCE_BY_BYTE[value] << (4 * index)
+    return result
+
+
+def month_days(month):
+    """%Y%m 月份的天数"""
+    return calendar.monthrange(int(month[:4]), int(month[4:]))[1]
+
+
+def month_range(start_month, end_month):
+    """生成 start_month 到 end_month（含）之间的月份列表，格式 %Y%m"""
+    year, month = int(start_month[:4]), int(start_month[4:])
+    months = []
+    while f"{year:04d}{month:02d}" <= end_month:
+        months.append(f"{year:04d}{month:02d}")
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return months
+
+
+def account_id(account):
+    """账号键（token 哈希的 16 位十六进制）转为 64 位整数"""
+    return int(account, 16)
+
+
+class SignHistoryStore:
+    """签到历史位图存储
+
+    四列定长数组（账号、月份、位图、是否完结）常驻内存，按 (账号, 月份) 建索引；
+    文件即这四列数组的原始字节，加载和保存都不需要逐条解析。
+    位图不保留"未到"的天（n 与未签一样编码为 0），所以只有在该月结束后保存的记录才标记为完结；
+    月内保存的记录在月份结束后需要重新获取，否则剩余的天会一直被算作漏签。
+    """
+
+    def __init__(self, path="sign-history.bin"):
+        self.path = path
+        self.accounts = array("Q")
+        self.months = array("I")
+        self.bitmaps = array("Q")
+        self.final = array("B")
+        self._index = {}
+        # 账号 -> 已保存月份（升序），多账号共用一个存储时按账号查月份不需要扫描全部索引
+        self._months_by_account = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                payload = f.read()
+        except OSError:
+            return
+        if not payload:
+            # 空文件按空存储处理
+            return
+        if len(payload) < HEADER.size:
+            raise ValueError(f"签到历史文件已损坏（文件头不完整）: {self.path}")
+
+        magic, version, count = HEADER.unpack_from(payload)
+        if magic != FILE_MAGIC or version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"不支持的签到历史文件格式: {self.path}")
+
+        columns = (self.accounts, self.months, self.bitmaps) + ((self.final,) if version >= 2 else ())
+        expected = HEADER.size + count * sum(column.itemsize for column in columns)
+        if len(payload) != expected:
+            raise ValueError(f"签到历史文件已损坏（应为 {expected} 字节，实际 {len(payload)} 字节）: {self.path}")
+
+        offset = HEADER.size
+        for column in columns:
+            size = count * column.itemsize
+            column.frombytes(payload[offset:offset + size])
+            offset += size
+        if version < 2:
+            self.final.frombytes(bytes(count))
+
+        self._index = {
+            (account, month): row
+            for row, (account, month) in enumerate(zip(self.accounts, self.months))
+        }
+        for account, month in self._index:
+            self._months_by_account.setdefault(account, []).append(month)
+        for months in self._months_by_account.values():
+            months.sort()
+
+    def save(self):
+        """写回文件（先写临时文件再替换）"""
+        with self._lock:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, len(self.bitmaps)))
+                for column in (self.accounts, self.months, self.bitmaps, self.final):
+                    f.write(column.tobytes())
+            os.replace(temp_path, self.path)
+
+    def __len__(self):
+        return len(self.bitmaps)
+
+    def put(self, account, month, sign_record, today=None):
+        """保存某账号某月的 signRecord；today 所在月份之前的月份标记为完结"""
+        key = (account_id(account), int(month))
+        bits = encode_record(sign_record)
+        final = month < (today or datetime.now()).strftime("%Y%m")
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                self._index[key] = len(self.bitmaps)
+                self.accounts.append(key[0])
+                self.months.append(key[1])
+                self.bitmaps.append(bits)
+                self.final.append(final)
+                bisect.insort(self._months_by_account.setdefault(key[0], []), key[1])
+            else:
+                self.bitmaps[row] = bits
+                self.final[row] = final
+
+    def get(self, account, month):
+        """某账号某月的位图，未保存返回 None"""
+        row = self._index.get((account_id(account), int(month)))
+        return None if row is None else self.bitmaps[row]
+
+    def has(self, account, month):
+        return (account_id(account), int(month)) in self._index
+
+    def is_final(self, account, month):
+        """该月记录是否在月份结束后保存（不会再变化，回填时可跳过）"""
+        row = self._index.get((account_id(account), int(month)))
+        return row is not None and bool(self.final[row])
+
+    def get_record(self, account, month):
+        """某账号某月的 signRecord 字符串，未保存返回 None"""
+        bits = self.get(account, month)
+        return None if bits is None else decode_record(bits, month_days(month))
+
+    def stored_months(self, account):
+        """某账号已保存的月份"""
+        return [f"{month:06d}" for month in self._months_by_account.get(account_id(account), ())]
+
+    def date_range(self, account, start, end):
+        """查询 [start, end] 日期范围内每天的状态，返回 [(date, 状态)]；未保存的月份跳过"""
+        result = []
+        for month in month_range(start.strftime("%Y%m"), end.strftime("%Y%m")):
+            bits = self.get(account, month)
+            if bits is None:
+                continue
+            year, mon = int(month[:4]), int(month[4:])
+            for day in range(1, month_days(month) + 1):
+                current = date(year, mon, day)
+                if start <= current <= end:
+                    result.append((current, (bits >> (2 * (day - 1))) & 0b11))
+        return result
+
+    def stats(self, account, start_month, end_month, today=None):
+        """计算月份范围内的签到统计
+
+        当月只统计到今天为止；今天尚未签到不算中断连续签到。未保存的月份按全部未签计算。
+        """
+        today = today or datetime.now()
+        current_month = today.strftime("%Y%m")
+
+        signed_days = filled_days = elapsed_days = 0
+        # 全范围每天 1 位的已签标记，第一天在最低位
+        presence = 0
+        monthly = {}
+
+        for month in month_range(start_month, min(end_month, current_month)):
+            days = today.day if month == current_month else month_days(month)
+            bits = (self.get(account, month) or 0) & ((1 << (2 * days)) - 1)
+
+            month_signed = count_signed(bits)
+            month_filled = count_filled(bits)
+            monthly[month] = {
+                "signedDays": month_signed,
+                "makeupDays": month_filled,
+                "missedDays": days - month_signed - month_filled,
+                "signRate": round((month_signed + month_filled) / days * 100, 1) if days else 0
+            }
+
+            presence |= presence_bits(bits) << elapsed_days
+            signed_days += month_signed
+            filled_days += month_filled
+            elapsed_days += days
+
+        streak_days = elapsed_days
+        if streak_days and end_month >= current_month and not (presence >> (streak_days - 1)) & 1:
+            # 今天还没签不算中断
+            streak_days -= 1
+        runs = format(presence & ((1 << streak_days) - 1), f"0{streak_days}b") if streak_days else ""
+
+        total_signed = signed_days + filled_days
+        return {
+            "months": len(monthly),
+            "elapsedDays": elapsed_days,
+            "signedDays": signed_days,
+            "makeupDays": filled_days,
+            "missedDays": elapsed_days - total_signed,
+            "signRate": round(total_signed / elapsed_days * 100, 1) if elapsed_days else 0,
+            "fillInRate": round(filled_days / total_signed * 100, 1) if total_signed else 0,
+            "longestStreak": max(map(len, runs.split("0"))) if runs else 0,
+            "currentStreak": len(runs) - len(runs.lstrip("1")),
+            "monthly": monthly
+        }
+
+    def aggregate(self, start_month, end_month):
+        """全部账号在月份范围内的汇总
+
+        选出范围内的行后把位图拼成一个大整数，用一次掩码和 bit_count 得到总数，不逐天遍历。
+        返回 {"accounts", "accountMonths", "signedDays", "makeupDays"}。
+        """
+        low, high = int(start_month), int(end_month)
+        with self._lock:
+            selected = array("Q", (
+                bits for month, bits in zip(self.months, self.bitmaps) if low <= month <= high
+            ))
+            accounts = {acc for acc, month in zip(self.accounts, self.months) if low <= month <= high}
+
+        if not selected:
+            return {"accounts": 0, "accountMonths": 0, "signedDays": 0, "makeupDays": 0}
+
+        combined = int.from_bytes(selected.tobytes(), "little")
+        # 每行 64 位中只有低 62 位有效，按行重复低位掩码
+        mask = int.from_bytes(LOW_MASK.to_bytes(8, "little") * len(selected), "little")
+        low_bits = combined & mask
+        high_bits = (combined >> 1) & mask
+
+        return {
+            "accounts": len(accounts),
+            "accountMonths": len(selected),
+            "signedDays": (low_bits & ~high_bits).bit_count(),
+            "makeupDays": (high_bits & ~low_bits).bit_count()
+        }
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from jetour_metrics import get_default_metrics
+from jetour_retry import CircuitBreakerRegistry, CircuitOpenError
+
+# 捷途共享 HTTP 客户端
+# 所有脚本共用一个带连接池的 Session，复用 TCP/TLS 连接，公共请求头只在这里定义一次
+
+DEFAULT_HEADERS = {
+    "Accept": "*/*",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "zh-CN,zh",
+    "Content-Type": "application/json",
+    "Origin": "https://h5-app.jetour.com.cn",
+    "Referer": "https://h5-app.jetour.com.cn/",
+    "Connection": "keep-alive",
+    "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 18_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 ios/1.0.0"
+}
+
+DEFAULT_TIMEOUT = 30
+
+# 单个账号同时发出的请求数上限：提取阶段并发获取 3 个接口，worker 任务图最多 2 个任务同时执行
+ACCOUNT_REQUEST_PARALLELISM = 3
+
+
+def pool_size_for(concurrency):
+    """多账号并发时每个主机需要的连接数：并发账号数 × 单个账号的请求并行度"""
+    return max(1, int(concurrency)) * ACCOUNT_REQUEST_PARALLELISM
+
+
+class JetourHttpClient:
+    """带连接池和 keep-alive 复用的 HTTP 客户端（线程安全，可在多账号间共享）"""
+
+    def __init__(self, pool_connections=4, pool_maxsize=16, timeout=DEFAULT_TIMEOUT, headers=None, breakers=None,
+                 metrics=None, adapter=None):
+        """
+        pool_connections: 缓存的主机连接池数量
+        pool_maxsize: 每个主机保持的最大连接数，多账号并发时应不小于 pool_size_for(并发数)
+        breakers: 按接口路径的熔断器，默认每个客户端一份（即多账号共享）
+        metrics: 接口指标注册表，默认使用进程内共享的注册表（见 jetour_metrics.py）
+        adapter: 连接适配器，默认按 JETOUR_HTTP_MODE 使用录制/回放适配器（见 jetour_replay.py），未设置时直连
+        """
+        self.timeout = timeout
+        self.breakers = breakers or CircuitBreakerRegistry()
+        self.metrics = metrics or get_default_metrics()
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        # 鉴权只走 access_token 参数，禁用 Cookie 避免多账号之间串用服务端下发的 Cookie
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        if adapter is None and os.environ.get("JETOUR_HTTP_MODE"):
+            from jetour_replay import adapter_from_env
+            adapter = adapter_from_env(pool_connections, pool_maxsize)
+        if adapter is None:
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        """发送请求，未指定超时时使用默认超时
+
+        连接失败、超时和 5xx 计入对应接口的熔断器，接口熔断时直接抛出 CircuitOpenError。
+        每个请求的状态码、耗时和收发字节数记入接口指标。
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = urlsplit(url).path
+        breaker = self.breakers.get(endpoint)
+        try:
+            breaker.before_call(endpoint)
+        except CircuitOpenError:
+            self.metrics.observe_request(endpoint, method, "circuit_open", 0.0)
+            raise
+
+        started = time.perf_counter()
+        settled = False
+        try:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.observe_request(endpoint, method, "error", time.perf_counter() - started)
+                if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                    breaker.record_failure()
+                    settled = True
+                raise
+
+            # 读取响应体（后续 .json() 复用已读取的内容），耗时包含下载时间
+            bytes_received = len(response.content)
+            body = response.request.body
+            self.metrics.observe_request(endpoint, method, response.status_code, time.perf_counter() - started,
+                                         bytes_sent=len(body) if body else 0, bytes_received=bytes_received)
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            settled = True
+            return response
+        finally:
+            if not settled:
+                # 其他异常（响应解码失败、重定向过多等）不计入熔断，但半开状态的试探名额必须释放
+                breaker.release_trial()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """获取进程内共享的默认客户端"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = JetourHttpClient()
+        return _default_client
+
+
+def configure_default_client(**kwargs):
+    """按参数重建默认客户端（如多账号模式按并发数调整连接池大小）"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = JetourHttpClient(**kwargs)
+        return _default_client
@@ -0,0 +1,206 @@
+import os
+import threading
+from bisect import bisect_left
+
+# 捷途接口指标
+# 按接口记录请求数、延迟直方图、重试次数、传输字节数和状态码，导出为 Prometheus 文本格式
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class EndpointStats:
+    """单个接口的统计"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def quantile(self, q):
+        """由直方图估算分位数（取所在桶的上界）"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.buckets):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.retries = {}
+
+    def observe_request(self, endpoint, method, status, seconds, bytes_sent=0, bytes_received=0):
+        """记录一次请求；status 为 HTTP 状态码，或 error / circuit_open"""
+        with self._lock:
+            stats = self.endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self.endpoints[(endpoint, method)] = EndpointStats()
+            stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.latency_sum += seconds
+            stats.count += 1
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+
+    def inc_retry(self, endpoint):
+        """记录一次重试，endpoint 为触发重试的接口路径"""
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def render_prometheus(self):
+        """Prometheus 文本格式"""
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            retries = sorted(self.retries.items())
+
+        lines = [
+            "# HELP jetour_http_requests_total HTTP requests by endpoint and status.",
+            "# TYPE jetour_http_requests_total counter"
+        ]
+        for (endpoint, method), stats in endpoints:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f"jetour_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}")
+
+        lines += [
+            "# HELP jetour_http_request_duration_seconds HTTP request latency.",
+            "# TYPE jetour_http_request_duration_seconds histogram"
+        ]
+        for (endpoint, method), stats in endpoints:
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), stats.buckets):
+                cumulative += bucket_count
+                lines.append(f"jetour_http_request_duration_seconds_bucket{_labels(endpoint=endpoint, method=method, le=bound)} {cumulative}")
+            lines.append(f"jetour_http_request_duration_seconds_sum{_labels(endpoint=endpoint, method=method)} {stats.latency_sum:.6f}")
+            lines.append(f"jetour_http_request_duration_seconds_count{_labels(endpoint=endpoint, method=method)} {stats.count}")
+
+        lines += [
+            "# HELP jetour_http_sent_bytes_total Request body bytes sent.",
+            "# TYPE jetour_http_sent_bytes_total counter"
+        ]
+        for (endpoint, method), stats in endpoints:
+            lines.append(f"jetour_http_sent_bytes_total{_labels(endpoint=endpoint, method=method)} {stats.bytes_sent}")
+
+        lines += [
+            "# HELP jetour_http_received_bytes_total Response body bytes received.",
+            "# TYPE jetour_http_received_bytes_total counter"
+        ]
+        for (endpoint, method), stats in endpoints:
+            lines.append(f"jetour_http_received_bytes_total{_labels(endpoint=endpoint, method=method)} {stats.bytes_received}")
+
+        lines += [
+            "# HELP jetour_http_retries_total Retries after a retryable failure, by the endpoint that failed.",
+            "# TYPE jetour_http_retries_total counter"
+        ]
+        for endpoint, count in retries:
+            lines.append(f"jetour_http_retries_total{_labels(endpoint=endpoint)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """写入 Prometheus textfile（先写临时文件再替换，供 node_exporter 采集）"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """在后台线程提供 /metrics 接口，返回 HTTP 服务对象"""
+        # 只有开启 /metrics 时才需要 HTTP 服务模块，不计入普通运行的启动时间
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def summary_lines(self):
+        """运行结束时打印的接口统计表"""
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            retries = sorted(self.retries.items())
+
+        lines = [f"{'接口':<45} {'请求':>6} {'失败':>6} {'平均(ms)':>9} {'p50≤(s)':>8} {'p99≤(s)':>8} {'接收(KB)':>9}"]
+        for (endpoint, method), stats in endpoints:
+            failed = sum(count for status, count in stats.statuses.items() if not status.startswith(("2", "3")))
+            average = stats.latency_sum / stats.count * 1000 if stats.count else 0
+            lines.append(
+                f"{method + ' ' + endpoint:<45} {stats.count:>6} {failed:>6} {average:>9.1f} "
+                f"{stats.quantile(0.5):>8} {stats.quantile(0.99):>8} {stats.bytes_received / 1024:>9.1f}"
+            )
+        if retries:
+            lines.append("重试次数: " + ", ".join(f"{endpoint}={count}" for endpoint, count in retries))
+        return lines
+
+
+_default_metrics = MetricsRegistry()
+_metrics_server = None
+
+
+def get_default_metrics():
+    """进程内共享的指标注册表"""
+    return _default_metrics
+
+
+def start_metrics_server_from_env():
+    """设置了 JETOUR_METRICS_PORT 时启动本地 /metrics 接口（只启动一次）"""
+    global _metrics_server
+    port = os.environ.get("JETOUR_METRICS_PORT")
+    if port and _metrics_server is None:
+        _metrics_server = _default_metrics.serve(int(port))
+    return _metrics_server
+
+
+def export_metrics(print_summary=True):
+    """运行结束时导出指标：打印统计表；设置 JETOUR_METRICS_FILE 时写入 Prometheus textfile"""
+    if print_summary and _default_metrics.endpoints:
+        print("\n【接口指标】")
+        for line in _default_metrics.summary_lines():
+            print(line)
+
+    path = os.environ.get("JETOUR_METRICS_FILE")
+    if path:
+        try:
+            _default_metrics.write_textfile(path)
+            print(f"接口指标已写入 {path}")
+        except OSError as e:
+            print(f"写入接口指标失败: {e}")
@@ -0,0 +1,202 @@
+import argparse
+import calendar
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# 捷途接口本地模拟服务
+# 用于压测和基准测试，可配置延迟、错误率和响应体大小，不访问生产环境
+
+
+def _sign_record(month, today):
+    """按月份生成确定性的签到记录（1=正常签到, 2=补签, 0=未签, n=未到）"""
+    year, mon = int(month[:4]), int(month[4:])
+    days = calendar.monthrange(year, mon)[1]
+    rng = random.Random(month)
+    current_month = today.strftime("%Y%m")
+    record = []
+    for day in range(1, days + 1):
+        if month > current_month or (month == current_month and day > today.day):
+            record.append("n")
+        else:
+            record.append(rng.choices("120", weights=(8, 1, 1))[0])
+    return "".join(record), days
+
+
+class MockJetourServer:
+    """模拟服务
+
+    latency: 每个请求的基础延迟（秒），实际延迟在 [latency, latency * 2] 之间
+    error_rate: 返回 HTTP 500 的概率
+    payload_bytes: 任务信息响应中额外填充的字节数，用于模拟大响应体
+    unopened_boxes: 盲盒数量接口返回的未拆数量
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, payload_bytes=0,
+                 unopened_boxes=1, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload_bytes = payload_bytes
+        self.unopened_boxes = unopened_boxes
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 才能保持连接，客户端连接池的效果才能体现
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self)
+
+            def do_PUT(self):
+                server.handle(self)
+
+            def do_POST(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, request):
+        """处理一个请求：模拟延迟和错误后按路径返回响应"""
+        parts = urlsplit(request.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        length = int(request.headers.get("Content-Length") or 0)
+        if length:
+            request.rfile.read(length)
+
+        with self._lock:
+            self.requests += 1
+            delay = self.latency * (1 + self._random.random()) if self.latency else 0
+            failed = self._random.random() < self.error_rate
+
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            self._send(request, 500, {"status": 500, "message": "模拟服务错误"})
+            return
+
+        payload = self.route(request.command, parts.path, params)
+        if payload is None:
+            self._send(request, 404, {"status": 404, "message": f"未知接口: {parts.path}"})
+        else:
+            self._send(request, 200, payload)
+
+    def route(self, method, path, params):
+        """按接口路径生成响应体，未知路径返回 None"""
+        today = datetime.now()
+
+        if path.endswith("/sign/sign-page"):
+            return {"status": 200, "data": {
+                "isSigned": False,
+                "pointReward": 1,
+                "memberReward": 0,
+                "cycleType": 2,
+                "cycleDays": today.weekday() + 1,
+                "nextStageReward": {
+                    "start": 7, "end": None, "pointReward": 1, "memberReward": 7,
+                    "needContinuousDays": 6 - today.weekday(), "status": 0
+                }
+            }}
+
+        if path.endswith("/sign/sign-record"):
+            month = params.get("monthInYear") or today.strftime("%Y%m")
+            record, days = _sign_record(month, today)
+            return {"status": 200, "data": {"month": month, "monthDays": days, "signRecord": record}}
+
+        if path.endswith("/tasks/load-one"):
+            return {"status": 200, "data": {"taskInfo": {
+                "id": "3439799346990943525",
+                "name": "签到",
+                "joinCount": 1210719,
+                "taskRuleDesc": "<p>模拟签到规则</p>" + "x" * self.payload_bytes
+            }}}
+
+        if path.endswith("/blind-box/user/count"):
+            return {"status": 200, "data": {
+                "totalCount": self.unopened_boxes + 3,
+                "openedCount": 3,
+                "unopenedCount": self.unopened_boxes
+            }}
+
+        if path.endswith("/blind-box/receive") and method == "PUT":
+            return {"status": 200, "data": {"name": "模拟盲盒奖励"}}
+
+        if path.endswith("/member/receiveRights") and method == "POST":
+            return {"status": 200, "data": {"isSuccess": False, "failMessage": "该权益每1月仅可领取一次"}}
+
+        if path.endswith("/member/consumer/detail"):
+            token = params.get("access_token", "")
+            return {"status": 200, "data": {
+                "id": f"member-{token}",
+                "mobile": "138****0000",
+                "levelName": "旅行自由客",
+                "levelOrder": 1,
+                "growth": 320,
+                "nextRiseValue": 1000,
+                "cardAccountList": [{"id": f"card-{token}"}]
+            }}
+
+        return None
+
+    @staticmethod
+    def _send(request, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json;charset=UTF-8")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途接口本地模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="基础延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的概率")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="任务信息响应额外填充字节数")
+    args = parser.parse_args()
+
+    mock = MockJetourServer(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                            payload_bytes=args.payload_bytes)
+    print(f"模拟服务已启动: {mock.base_url}（设置 JETOUR_API_BASE_URL={mock.base_url} 使用）")
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.httpd.server_close()
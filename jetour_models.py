@@ -0,0 +1,241 @@
+import json
+
+from jetour_retry import FatalError
+
+# 捷途接口响应模型
+# 响应体解析后统一在这里校验结构和类型，业务代码使用带类型的属性，不再层层 .get() 取默认值
+
+# 安装了 orjson 时使用更快的解析，否则使用标准库
+try:
+    import orjson
+
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+# 必需字段的默认值标记
+REQUIRED = object()
+
+
+class MalformedResponseError(FatalError):
+    """响应结构不符合预期（缺少必需字段、类型错误），重试也不会恢复"""
+
+
+class Lenient:
+    """只用于展示的字段类型：类型不符时尽量转换（如 "120.5" 转为数字），无法转换时取默认值
+
+    这类字段格式变化不应让整个响应解析失败，例如会员详情中只有 cardAccountList 影响执行流程。
+    """
+
+    __slots__ = ("kind",)
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def convert(self, value, default):
+        try:
+            if self.kind is int:
+                return int(float(value))
+            if self.kind is float:
+                return float(value)
+            if self.kind is str and isinstance(value, (int, float)):
+                return str(value)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        return default
+
+
+def response_status(payload):
+    """响应外层的业务状态码，外层不是 {"status": ...} 结构时抛出 MalformedResponseError"""
+    if not isinstance(payload, dict) or "status" not in payload:
+        raise MalformedResponseError(f"响应缺少 status 字段: {str(payload)[:200]}")
+    return payload["status"]
+
+
+def _coerce(model, key, value, kind):
+    """按声明的类型校验字段值；id 类字符串字段接受数字并转为字符串"""
+    if isinstance(kind, type) and issubclass(kind, Model):
+        if isinstance(value, dict):
+            return kind.from_data(value)
+    elif kind is bool:
+        if isinstance(value, bool):
+            return value
+    elif kind is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif kind is float:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+    elif kind is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+    elif isinstance(value, kind):
+        return value
+    raise MalformedResponseError(
+        f"{model.__name__}.{key} 类型错误: 期望 {kind.__name__}, 实际为 {type(value).__name__}"
+    )
+
+
+class Model:
+    """响应模型基类
+
+    子类以 FIELDS 声明字段：(属性名, JSON 键, 类型, 默认值)，默认值为 REQUIRED 表示必需字段，
+    类型为 Lenient(类型) 时类型不符不报错（见 Lenient）。字段值为 null 时按缺失处理。
+    DATA_KEY 非空时模型对应 data 下的该键（如 data.taskInfo）。
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    DATA_KEY = None
+
+    @classmethod
+    def from_data(cls, data):
+        if not isinstance(data, dict):
+            raise MalformedResponseError(f"{cls.__name__} 应为对象，实际为 {type(data).__name__}")
+        obj = cls.__new__(cls)
+        for name, key, kind, default in cls.FIELDS:
+            value = data.get(key)
+            if value is None:
+                if default is REQUIRED:
+                    raise MalformedResponseError(f"{cls.__name__} 缺少必需字段 {key}")
+                setattr(obj, name, default)
+            elif isinstance(kind, Lenient):
+                try:
+                    setattr(obj, name, _coerce(cls, key, value, kind.kind))
+                except MalformedResponseError:
+                    setattr(obj, name, kind.convert(value, default))
+            else:
+                setattr(obj, name, _coerce(cls, key, value, kind))
+        return obj
+
+    @classmethod
+    def from_response(cls, payload):
+        """从完整响应 {"status": 200, "data": {...}} 解析"""
+        response_status(payload)
+        data = payload.get("data")
+        if cls.DATA_KEY is not None and isinstance(data, dict):
+            data = data.get(cls.DATA_KEY)
+        if data is None:
+            raise MalformedResponseError(f"{cls.__name__} 响应缺少 data{'.' + cls.DATA_KEY if cls.DATA_KEY else ''}")
+        return cls.from_data(data)
+
+    def to_dict(self):
+        """转换回接口字段名的字典（输出仪表盘数据用）"""
+        result = {}
+        for name, key, _, _ in self.FIELDS:
+            value = getattr(self, name)
+            result[key] = value.to_dict() if isinstance(value, Model) else value
+        return result
+
+    def __bool__(self):
+        """任一字段有值时为真，空对象（如 "nextStageReward": {}）为假，与原来对字典的判断一致"""
+        return any(getattr(self, name) is not None for name, _, _, _ in self.FIELDS)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name, _, _, _ in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+class NextStageReward(Model):
+    FIELDS = (
+        ("start", "start", int, None),
+        ("end", "end", int, None),
+        ("point_reward", "pointReward", int, None),
+        ("member_reward", "memberReward", int, None),
+        ("need_continuous_days", "needContinuousDays", int, None),
+        ("status", "status", int, None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+class SignPage(Model):
+    """签到页面 sign/sign-page"""
+    FIELDS = (
+        ("is_signed", "isSigned", bool, REQUIRED),
+        ("point_reward", "pointReward", int, 0),
+        ("member_reward", "memberReward", int, 0),
+        ("cycle_type", "cycleType", int, 0),
+        ("cycle_days", "cycleDays", int, 0),
+        ("next_stage_reward", "nextStageReward", NextStageReward, None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+class SignRecord(Model):
+    """签到记录 sign/sign-record，sign_record 每天一个字符：1=正常签到, 2=补签, 0=未签, n=未到"""
+    FIELDS = (
+        ("month", "month", str, None),
+        ("month_days", "monthDays", int, None),
+        ("sign_record", "signRecord", str, ""),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+class TaskInfo(Model):
+    """任务信息 tasks/load-one 的 data.taskInfo"""
+    DATA_KEY = "taskInfo"
+    FIELDS = (
+        ("id", "id", str, REQUIRED),
+        ("code", "code", str, None),
+        ("name", "name", str, ""),
+        ("description", "description", str, None),
+        ("task_rule_desc", "taskRuleDesc", str, ""),
+        ("join_count", "joinCount", int, None),
+        ("icon", "icon", str, None),
+        ("rule_type", "ruleType", int, None),
+        ("reward_type", "rewardType", int, None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+class BlindBoxCount(Model):
+    """盲盒数量 blind-box/user/count"""
+    FIELDS = (
+        ("total_count", "totalCount", int, REQUIRED),
+        ("opened_count", "openedCount", int, REQUIRED),
+        ("unopened_count", "unopenedCount", int, REQUIRED),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+class RightsResult(Model):
+    """领权益结果 member/receiveRights"""
+    FIELDS = (
+        ("is_success", "isSuccess", bool, REQUIRED),
+        ("fail_message", "failMessage", str, ""),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+class ConsumerDetail(Model):
+    """会员详情 member/consumer/detail
+
+    worker 只需要 cardAccountList（严格校验），其余字段只在仪表盘展示，格式不符时不影响获取 card_account_id。
+    """
+    FIELDS = (
+        ("id", "id", Lenient(str), None),
+        ("account_id", "accountId", Lenient(str), None),
+        ("mobile", "mobile", Lenient(str), None),
+        ("level_name", "levelName", Lenient(str), None),
+        ("level_order", "levelOrder", Lenient(int), None),
+        ("growth", "growth", Lenient(int), None),
+        ("next_rise_value", "nextRiseValue", Lenient(int), None),
+        ("jetour_coins", "jetourCoins", Lenient(float), None),
+        ("card_account_list", "cardAccountList", list, ()),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+    @property
+    def card_account_id(self):
+        """第一个卡账户的 id，没有卡账户时为 None"""
+        if not self.card_account_list:
+            return None
+        card_account = self.card_account_list[0]
+        if not isinstance(card_account, dict):
+            raise MalformedResponseError("ConsumerDetail.cardAccountList 中的卡账户应为对象")
+        card_id = card_account.get("id")
+        return None if card_id is None else str(card_id)
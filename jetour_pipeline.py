@@ -0,0 +1,46 @@
+import os
+
+from extract_jetour_sign_info import JetourSignInfoExtractor
+from jetour_api import RunSnapshot
+from jetour_auto_worker import JetourAutoWorker
+from jetour_metrics import export_metrics, start_metrics_server_from_env
+
+# 捷途单进程流水线
+# 在同一个进程中先执行自动任务（签到、拆盲盒、领权益），再提取仪表盘数据；
+# 两个阶段共享一份运行快照，worker 已获取的接口响应在提取阶段直接复用，只有写接口调用后才重新获取
+
+
+def run_pipeline(access_token=None, task_id=None, output_mode="sharded", backfill_months=0, save=True):
+    """执行一次完整流水线，返回 {"worker": 任务结果摘要, "reused": 复用的响应数}
+
+    access_token / task_id 未传入时从环境变量读取（JETOUR_ACCESS_TOKEN / JETOUR_TASK_ID，
+    兼容提取脚本使用的 ACCESS_TOKEN / TASK_ID）。worker 初始化失败时仍继续提取，与分两步执行时一致。
+    """
+    access_token = access_token or os.environ.get("JETOUR_ACCESS_TOKEN") or os.environ.get("ACCESS_TOKEN", "")
+    task_id = task_id or os.environ.get("JETOUR_TASK_ID") or os.environ.get("TASK_ID", "")
+    snapshot = RunSnapshot()
+
+    summary = None
+    try:
+        worker = JetourAutoWorker(access_token=access_token, task_id=task_id, snapshot=snapshot)
+        summary = worker.run(save=save)
+    except ValueError as e:
+        print(f"自动任务未执行: {e}")
+
+    if access_token and task_id:
+        extractor = JetourSignInfoExtractor(access_token, task_id, snapshot=snapshot)
+        if backfill_months > 0:
+            extractor.backfill(months=backfill_months)
+        extractor.extract_key_info(output_mode=output_mode)
+
+    print(f"运行快照复用接口响应 {snapshot.hits} 次")
+    return {"worker": summary, "reused": snapshot.hits}
+
+
+if __name__ == "__main__":
+    start_metrics_server_from_env()
+    run_pipeline(
+        output_mode=os.environ.get("DASHBOARD_OUTPUT", "sharded"),
+        backfill_months=int(os.environ.get("BACKFILL_MONTHS", "0"))
+    )
+    export_metrics()
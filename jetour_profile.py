@@ -0,0 +1,157 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from jetour_cache import DEFAULT_CACHE_DIR, token_hash
+
+# 捷途账号资料缓存
+# 按 token 哈希保存会员详情中的 card_account_id、卡账户列表和会员等级信息，
+# 启动时不必每次请求 member/consumer/detail；权益领取因 id 失效而失败时作废重取
+
+DEFAULT_PROFILE_FILE = os.environ.get("JETOUR_PROFILE_FILE", os.path.join(DEFAULT_CACHE_DIR, "profiles.json"))
+# 账号资料有效期（秒），过期后重新请求会员详情
+DEFAULT_PROFILE_TTL = 7 * 24 * 3600
+# 多账号连续写入时最多每隔这么多秒重写一次文件，进程退出时补写最后一次
+PROFILE_WRITE_INTERVAL = 1.0
+
+# 仪表盘 userInfo 使用的会员详情字段
+MEMBER_FIELDS = ("accountId", "mobile", "levelName", "levelOrder", "growth", "nextRiseValue", "jetourCoins")
+
+# 每个文件一份内存中的资料表，多个实例（多线程）共享
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def profile_from_detail(detail):
+    """从会员详情接口的 data 部分提取账号资料，卡账户列表为空时 cardAccountId 为 None"""
+    card_accounts = detail.get("cardAccountList") or []
+    member = {field: detail[field] for field in MEMBER_FIELDS if detail.get(field) is not None}
+    if "accountId" not in member and detail.get("id") is not None:
+        member["accountId"] = detail["id"]
+    return {
+        "fetchedAt": time.time(),
+        "cardAccountId": card_accounts[0].get("id") if card_accounts else None,
+        "cardAccountList": card_accounts,
+        "member": member
+    }
+
+
+def profile_key(token, origin=None):
+    """资料表的键：token 哈希；请求发往其他服务（origin 为协议和主机）时附加 origin，不覆盖正式接口的资料"""
+    key = token_hash(token)
+    return f"{key}@{origin}" if origin else key
+
+
+class AccountProfileStore:
+    """账号资料缓存
+
+    文件格式：{token 哈希: {"fetchedAt": 时间戳, "cardAccountId": ..., "cardAccountList": [...], "member": {...}}}
+    设置了 base_url 的客户端以 origin 区分资料（键为 "token 哈希@协议://主机"）。
+    与响应缓存一样，设置 JETOUR_CACHE_DISABLED=1 或 enabled=False 时不读取缓存的资料。
+    """
+
+    def __init__(self, path=DEFAULT_PROFILE_FILE, ttl=DEFAULT_PROFILE_TTL, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("JETOUR_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.path = path
+        self.ttl = ttl
+        self.enabled = enabled
+        with _stores_lock:
+            state = _stores.get(os.path.abspath(path))
+            if state is None:
+                state = {"path": os.path.abspath(path), "profiles": None, "dirty": False, "written_at": 0.0,
+                         "lock": threading.Lock()}
+                _stores[os.path.abspath(path)] = state
+        self._state = state
+
+    def _profiles(self):
+        """首次使用时从文件载入（调用方持有锁）"""
+        state = self._state
+        if state["profiles"] is None:
+            try:
+                with open(state["path"], "r", encoding="utf-8") as f:
+                    state["profiles"] = json.load(f)
+            except (OSError, ValueError):
+                state["profiles"] = {}
+        return state["profiles"]
+
+    def get(self, token, allow_expired=False, origin=None):
+        """读取账号资料，不存在或已过期返回 None（allow_expired=True 时过期资料照常返回）"""
+        if not self.enabled:
+            return None
+        with self._state["lock"]:
+            profile = self._profiles().get(profile_key(token, origin))
+        if profile is None:
+            return None
+        if not allow_expired and time.time() - profile.get("fetchedAt", 0) >= self.ttl:
+            return None
+        return profile
+
+    def put(self, token, detail, origin=None):
+        """用会员详情接口的 data 部分更新账号资料，返回资料"""
+        profile = profile_from_detail(detail)
+        with self._state["lock"]:
+            self._profiles()[profile_key(token, origin)] = profile
+            self._mark_dirty_locked()
+        return profile
+
+    def invalidate(self, token, origin=None):
+        """作废账号资料（如 card_account_id 已失效）"""
+        with self._state["lock"]:
+            if self._profiles().pop(profile_key(token, origin), None) is not None:
+                self._mark_dirty_locked()
+
+    def flush(self):
+        """立即写入尚未落盘的资料"""
+        with self._state["lock"]:
+            return self._flush_locked()
+
+    def _mark_dirty_locked(self):
+        state = self._state
+        state["dirty"] = True
+        if time.monotonic() - state["written_at"] >= PROFILE_WRITE_INTERVAL:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        state = self._state
+        if not state["dirty"]:
+            return False
+        state["dirty"] = False
+        state["written_at"] = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(state["path"]), exist_ok=True)
+            temp_path = f"{state['path']}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(state["profiles"], f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, state["path"])
+        except OSError:
+            return False
+        return True
+
+
+def user_info(profile):
+    """账号资料转换为仪表盘的 userInfo，没有资料时返回 None"""
+    if not profile:
+        return None
+    return dict(profile.get("member") or {})
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_profile_store():
+    """获取进程内共享的默认账号资料缓存"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = AccountProfileStore()
+        return _default_store
+
+
+@atexit.register
+def _flush_all_profiles():
+    for path in list(_stores):
+        AccountProfileStore(path).flush()
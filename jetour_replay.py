@@ -0,0 +1,335 @@
+import argparse
+import contextlib
+import cProfile
+import json
+import mmap
+import os
+import pstats
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from jetour_models import loads
+
+# 捷途请求录制与回放
+# 录制模式把脚本发出的每个请求和响应（token 已脱敏）追加到 JSONL；回放模式从内存映射的索引中按
+# 方法、路径和参数返回录制的响应，不访问网络，可选不等待，用于离线、可重复地分析和测试真实流量
+
+# 仓库根目录的 requests.jsonl 是需求清单（已在 .gitignore 中），录制文件放在单独的目录
+DEFAULT_RECORD_FILE = os.environ.get("JETOUR_RECORD_FILE", os.path.join("recordings", "requests.jsonl"))
+
+# 请求参数、请求体和响应体中需要脱敏的字段
+REDACTED_KEYS = {"access_token", "accessToken", "token", "cardAccountId"}
+REDACTED = "<redacted>"
+
+# 记录行以 {"k":"<请求键>", 开头，建立索引时只解析请求键
+KEY_PREFIX = b'{"k":'
+_key_decoder = json.JSONDecoder()
+
+
+def redact(value):
+    """递归替换需要脱敏的字段"""
+    if isinstance(value, dict):
+        return {key: REDACTED if key in REDACTED_KEYS else redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def split_url(url):
+    """拆分为 (路径, 已脱敏的参数)"""
+    parts = urlsplit(url)
+    return parts.path, redact(dict(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+def request_key(method, path, params):
+    """请求键：方法 + 路径 + 按名称排序的参数"""
+    query = urlencode(sorted(params.items()))
+    return f"{method} {path}?{query}" if query else f"{method} {path}"
+
+
+def _redact_body(body):
+    if not body:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    try:
+        return redact(json.loads(body))
+    except ValueError:
+        return body
+
+
+class FixtureWriter:
+    """录制文件写入（线程安全，每条记录立即落盘）"""
+
+    def __init__(self, path=DEFAULT_RECORD_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, request, response, elapsed):
+        path, params = split_url(request.url)
+        text = response.content.decode(response.encoding or "utf-8", "replace")
+        # 响应中原样出现的 token 等参数值也一并替换
+        query = dict(parse_qsl(urlsplit(request.url).query, keep_blank_values=True))
+        for key in REDACTED_KEYS:
+            if query.get(key):
+                text = text.replace(query[key], REDACTED)
+        try:
+            body = json.dumps(redact(json.loads(text)), ensure_ascii=False, separators=(",", ":"))
+        except ValueError:
+            body = text
+        record = {
+            "k": request_key(request.method, path, params),
+            "method": request.method,
+            "path": path,
+            "params": params,
+            "body": _redact_body(request.body),
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "response": body,
+            "elapsed": round(elapsed, 4),
+            "t": round(time.time(), 3)
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """录制模式：正常发出请求，同时把请求和响应写入录制文件"""
+
+    def __init__(self, path=DEFAULT_RECORD_FILE, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = FixtureWriter(path)
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # 读取响应体后再计时，与真实请求的耗时一致
+        response.content
+        self.writer.write(request, response, time.perf_counter() - started)
+        return response
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+
+class FixtureIndex:
+    """录制文件的内存映射索引
+
+    建立索引时只解析每行开头的请求键并记下行的偏移，响应在命中时才从映射中解码。
+    同一请求键录制了多次时按顺序依次返回，用完后重复最后一次；参数不同（如 monthInYear 跟随当前月份）
+    找不到完全匹配时，退回到同方法同路径的录制。
+    """
+
+    def __init__(self, path=DEFAULT_RECORD_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.exact = {}
+        self.loose = {}
+        self._served = {}
+        self._build()
+
+    def _build(self):
+        if self._map is None:
+            return
+        data = self._map
+        size = len(data)
+        position = 0
+        while position < size:
+            end = data.find(b"\n", position)
+            if end < 0:
+                end = size
+            if end > position:
+                key = self._read_key(position, end)
+                if key is not None:
+                    self.exact.setdefault(key, []).append((position, end))
+                    method, _, rest = key.partition(" ")
+                    self.loose.setdefault((method, rest.split("?", 1)[0]), []).append((position, end))
+            position = end + 1
+
+    def _read_key(self, start, end):
+        line = self._map[start:end]
+        try:
+            if line.startswith(KEY_PREFIX):
+                key, _ = _key_decoder.raw_decode(line[len(KEY_PREFIX):].decode("utf-8"))
+                return key
+            return loads(line)["k"]
+        except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+            # 进程中断可能留下不完整的最后一行
+            return None
+
+    def __len__(self):
+        return sum(len(offsets) for offsets in self.exact.values())
+
+    def lookup(self, method, path, params):
+        """返回下一条匹配的录制记录，没有录制时返回 None"""
+        key = request_key(method, path, params)
+        with self._lock:
+            offsets = self.exact.get(key)
+            if offsets is None:
+                key = (method, path)
+                offsets = self.loose.get(key)
+                if offsets is None:
+                    return None
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            start, end = offsets[min(served, len(offsets) - 1)]
+            line = self._map[start:end]
+        return loads(line)
+
+    def param_values(self, name):
+        """录制中某个请求参数出现过的值（按出现次数从多到少）"""
+        counts = {}
+        for key, offsets in self.exact.items():
+            query = key.partition("?")[2]
+            for param, value in parse_qsl(query, keep_blank_values=True):
+                if param == name:
+                    counts[value] = counts.get(value, 0) + len(offsets)
+        return sorted(counts, key=counts.get, reverse=True)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """回放模式：从录制文件返回响应，不发出网络请求
+
+    delay=True 时按录制的耗时等待，默认立即返回。没有录制的请求返回 404（reason 为 Not Recorded）。
+    """
+
+    def __init__(self, path=DEFAULT_RECORD_FILE, delay=False):
+        super().__init__()
+        self.index = FixtureIndex(path)
+        self.delay = delay
+        self.misses = 0
+
+    def send(self, request, **kwargs):
+        path, params = split_url(request.url)
+        record = self.index.lookup(request.method, path, params)
+
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = "utf-8"
+        if record is None:
+            self.misses += 1
+            response.status_code = 404
+            response.reason = "Not Recorded"
+            response.headers = CaseInsensitiveDict({"Content-Type": "application/json;charset=UTF-8"})
+            response._content = json.dumps({"status": 404, "message": f"未录制的请求: {request.method} {path}"},
+                                           ensure_ascii=False).encode("utf-8")
+            return response
+
+        if self.delay and record.get("elapsed"):
+            time.sleep(record["elapsed"])
+        response.status_code = record["status"]
+        response.reason = "OK" if record["status"] < 400 else "Recorded Error"
+        response.headers = CaseInsensitiveDict({"Content-Type": record.get("content_type") or "application/json"})
+        response._content = record["response"].encode("utf-8")
+        return response
+
+    def close(self):
+        self.index.close()
+
+
+def adapter_from_env(pool_connections, pool_maxsize):
+    """按环境变量 JETOUR_HTTP_MODE（record / replay）创建连接适配器，未设置时返回 None"""
+    mode = os.environ.get("JETOUR_HTTP_MODE", "").lower()
+    path = os.environ.get("JETOUR_RECORD_FILE", DEFAULT_RECORD_FILE)
+    if mode == "record":
+        return RecordingAdapter(path, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    if mode == "replay":
+        delay = os.environ.get("JETOUR_REPLAY_DELAY", "").lower() in ("1", "true", "yes")
+        return ReplayAdapter(path, delay=delay)
+    if mode:
+        raise ValueError(f"未知的 JETOUR_HTTP_MODE: {mode}（可选 record / replay）")
+    return None
+
+
+def profile(path, target="pipeline", repeat=10, delay=False, task_id=None, sort="cumulative", top=25):
+    """在回放流量上重复执行 worker / 提取 / 流水线并输出 cProfile 统计"""
+    # 导入放在函数内：录制/回放适配器本身不依赖这些模块
+    from extract_jetour_sign_info import JetourSignInfoExtractor
+    from jetour_api import RunSnapshot
+    from jetour_auto_worker import JetourAutoWorker
+    from jetour_benchmark import BENCHMARK_WORKER_CONFIG
+    from jetour_http import configure_default_client
+
+    # 关闭磁盘缓存，保证每次执行的请求都相同
+    os.environ["JETOUR_CACHE_DISABLED"] = "1"
+    adapter = ReplayAdapter(path, delay=delay)
+    configure_default_client(adapter=adapter)
+    task_id = task_id or next(iter(adapter.index.param_values("taskId")), "replay-task")
+
+    def run_once(index):
+        token = f"replay-token-{index}"
+        snapshot = RunSnapshot() if target == "pipeline" else None
+        if target in ("worker", "pipeline"):
+            JetourAutoWorker(access_token=token, task_id=task_id, account_name=f"replay-{index}",
+                             config=BENCHMARK_WORKER_CONFIG, snapshot=snapshot).run(save=False)
+        if target in ("extract", "pipeline"):
+            JetourSignInfoExtractor(token, task_id, snapshot=snapshot).extract_key_info(output_mode="sharded")
+
+    profiler = cProfile.Profile()
+    with tempfile.TemporaryDirectory(prefix="jetour-replay-") as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                started = time.perf_counter()
+                profiler.enable()
+                for index in range(repeat):
+                    run_once(index)
+                profiler.disable()
+                elapsed = time.perf_counter() - started
+        finally:
+            os.chdir(cwd)
+
+    print(f"回放 {path}: {target} x {repeat}, 共 {elapsed:.3f} 秒, 每次 {elapsed / repeat * 1000:.1f} 毫秒, "
+          f"未录制的请求 {adapter.misses} 次")
+    pstats.Stats(profiler).strip_dirs().sort_stats(sort).print_stats(top)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途请求录制文件查看与离线性能分析")
+    parser.add_argument("command", choices=["stats", "profile"],
+                        help="stats: 各请求的录制次数；profile: 在回放流量上执行并输出 cProfile 统计")
+    parser.add_argument("file", nargs="?", default=DEFAULT_RECORD_FILE, help="录制文件路径")
+    parser.add_argument("--target", choices=["worker", "extract", "pipeline"], default="pipeline",
+                        help="profile 执行的对象")
+    parser.add_argument("--repeat", type=int, default=10, help="profile 重复执行次数")
+    parser.add_argument("--delay", action="store_true", help="按录制的耗时等待")
+    parser.add_argument("--task-id", help="任务 ID，默认取录制中出现最多的 taskId")
+    parser.add_argument("--sort", default="cumulative", help="cProfile 排序字段")
+    parser.add_argument("--top", type=int, default=25, help="输出的函数数量")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        index = FixtureIndex(args.file)
+        print(f"{args.file}: {len(index)} 条记录, {len(index.exact)} 个不同请求")
+        for key, offsets in sorted(index.exact.items()):
+            print(f"{len(offsets):>6}  {key}")
+    else:
+        profile(args.file, target=args.target, repeat=args.repeat, delay=args.delay, task_id=args.task_id,
+                sort=args.sort, top=args.top)
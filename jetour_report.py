@@ -0,0 +1,315 @@
+import argparse
+import json
+import os
+import random
+import time
+from array import array
+from datetime import date, datetime
+
+from jetour_dashboard import DASHBOARD_DIR, DashboardWriter
+from jetour_history import month_days
+
+# 捷途多账号汇总报表
+# 把各账号的概览（data/accounts/<账号>/summary.json 和当月签到记录分片）和 worker 结果（fleet-results.jsonl）
+# 按列装入定长数组，一次遍历算出全体统计，输出 data/fleet-report.json；仪表盘直接渲染报表，不在浏览器中逐账号汇总
+
+REPORT_FILE = "fleet-report.json"
+# 报表中列出的连续签到可能中断的账号数上限（按连续天数从多到少）
+RISK_LIMIT = 50
+# 签到率分布的区间宽度（%）
+RATE_BIN = 10
+
+SIGNED_CODES = (ord("1"), ord("2"))
+RIGHTS_OUTCOMES = ("received", "already_received", "failed", "unknown")
+
+
+class FleetColumns:
+    """按列存放的账号数据
+
+    每个账号占每列的同一下标；records 是所有账号当月 signRecord 拼接的定长字节串（每行 width 字节，
+    不足补 n），按天统计时直接对列切片计数。
+    """
+
+    def __init__(self, month):
+        self.month = month
+        self.width = month_days(month)
+        self.keys = []
+        self.names = []
+        # 概览中的数据是否属于报表月份（过期的账号不参与按天统计）
+        self.current = array("b")
+        self.sign_rate = array("d")
+        self.signed_days = array("l")
+        self.makeup_days = array("l")
+        self.missed_days = array("l")
+        self.continuous_days = array("l")
+        self.point_reward = array("l")
+        self.member_reward = array("l")
+        self.records = bytearray()
+        # worker 结果：-1 表示没有该账号的结果
+        self.worker_ok = array("b")
+        self.sign_failed = array("b")
+        self.box_total = array("l")
+        self.box_opened = array("l")
+        self.box_unopened = array("l")
+        self.box_opened_now = array("l")
+        self.rights_outcome = array("b")
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, accounts, records=(), month=None):
+        """accounts: {账号: 概览（含当月 signRecord）}；records: worker 结果记录（含 accountKey）"""
+        columns = cls(month or datetime.now().strftime("%Y%m"))
+        width = columns.width
+        blank = b"n" * width
+        results = {record.get("accountKey") or record.get("account"): record for record in records}
+
+        for key in list(accounts) + [key for key in results if key not in accounts]:
+            entry = accounts.get(key) or {}
+            stats = entry.get("signStats") or {}
+            current = entry.get("month") == columns.month
+            record = results.get(key)
+
+            columns.keys.append(key)
+            columns.names.append(record.get("account") if record else None)
+            columns.current.append(current)
+            columns.sign_rate.append(float(stats.get("signRate") or 0))
+            columns.signed_days.append(int(stats.get("signedDays") or 0))
+            columns.makeup_days.append(int(stats.get("makeupDays") or 0))
+            columns.missed_days.append(int(stats.get("missedDays") or 0))
+            columns.continuous_days.append(int(entry.get("continuousDays") or 0))
+            columns.point_reward.append(int(entry.get("pointReward") or 0))
+            columns.member_reward.append(int(entry.get("memberReward") or 0))
+            sign_record = (entry.get("signRecord") or "").encode("ascii", "replace") if current else b""
+            columns.records += sign_record[:width].ljust(width, b"n") if sign_record else blank
+            columns._append_result(record)
+        return columns
+
+    def _append_result(self, record):
+        tasks = (record or {}).get("tasks") or {}
+        boxes = (tasks.get("blind_box") or {}).get("data") or {}
+        rights = tasks.get("rights") or {}
+
+        if record is None:
+            self.worker_ok.append(-1)
+            self.sign_failed.append(-1)
+        else:
+            self.worker_ok.append(bool(record.get("success")))
+            self.sign_failed.append((tasks.get("sign_in") or {}).get("status", "success") != "success")
+        self.box_total.append(int(boxes.get("totalCount") or 0))
+        self.box_opened.append(int(boxes.get("openedCount") or 0))
+        self.box_unopened.append(int(boxes.get("unopenedCount") or 0))
+        self.box_opened_now.append(int(boxes.get("opened") or 0))
+
+        if not rights:
+            outcome = "unknown"
+        elif rights.get("status") == "success":
+            outcome = (rights.get("data") or {}).get("outcome", "received")
+        else:
+            outcome = "failed"
+        self.rights_outcome.append(RIGHTS_OUTCOMES.index(outcome) if outcome in RIGHTS_OUTCOMES else 3)
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def build_report(columns, today=None, risk_limit=RISK_LIMIT):
+    """从按列的账号数据生成报表"""
+    today = today or date.today()
+    width = columns.width
+    blob = bytes(columns.records)
+    current = columns.current
+    current_count = sum(current)
+
+    # 按天统计：第 d 天的列是 blob[d::width]
+    day_columns = [blob[day::width] for day in range(width)]
+    signed = [column.count(b"1") for column in day_columns]
+    makeup = [column.count(b"2") for column in day_columns]
+    missed = [column.count(b"0") for column in day_columns]
+    year, month = int(columns.month[:4]), int(columns.month[4:])
+    # 按签到规则估算：周一至周六每次 1 捷途币，周日 2 捷途币
+    points = [(signed[day] + makeup[day]) * (2 if date(year, month, day + 1).weekday() == 6 else 1)
+              for day in range(width)]
+
+    in_month = today.year == year and today.month == month
+    today_column = day_columns[today.day - 1] if in_month else b""
+    signed_today = today_column.count(b"1") + today_column.count(b"2")
+
+    # 连续签到中、但今天还没有签到的账号
+    at_risk = []
+    if in_month:
+        at_risk = [index for index, (days, status, is_current)
+                   in enumerate(zip(columns.continuous_days, today_column, current))
+                   if days > 0 and is_current and status not in SIGNED_CODES]
+    at_risk.sort(key=lambda index: -columns.continuous_days[index])
+
+    rates = sorted(rate for rate, is_current in zip(columns.sign_rate, current) if is_current)
+    bins = [0] * (100 // RATE_BIN)
+    for rate in rates:
+        bins[min(int(rate // RATE_BIN), len(bins) - 1)] += 1
+
+    outcomes = [0] * len(RIGHTS_OUTCOMES)
+    for outcome in columns.rights_outcome:
+        outcomes[outcome] += 1
+
+    with_results = len(columns) - columns.worker_ok.count(-1)
+    return {
+        "generatedAt": datetime.now().isoformat(timespec="seconds"),
+        "month": columns.month,
+        "day": today.day if in_month else None,
+        "totals": {
+            "accounts": len(columns),
+            "withSignData": current_count,
+            "stale": len(columns) - current_count,
+            "signedToday": signed_today,
+            "signedDays": sum(columns.signed_days),
+            "makeupDays": sum(columns.makeup_days),
+            "missedDays": sum(columns.missed_days),
+            "pointReward": sum(columns.point_reward),
+            "memberReward": sum(columns.member_reward),
+            "avgContinuousDays": round(sum(columns.continuous_days) / len(columns), 2) if len(columns) else 0,
+            "withResults": with_results,
+            "workerFailed": columns.worker_ok.count(0),
+            "signInFailed": columns.sign_failed.count(1)
+        },
+        "signRate": {
+            "binWidth": RATE_BIN,
+            "counts": bins,
+            "mean": round(sum(rates) / len(rates), 1) if rates else 0,
+            "p10": _percentile(rates, 10),
+            "median": _percentile(rates, 50),
+            "p90": _percentile(rates, 90)
+        },
+        "streakAtRisk": {
+            "count": len(at_risk),
+            "accounts": [{
+                "account": columns.keys[index],
+                "name": columns.names[index],
+                "continuousDays": columns.continuous_days[index],
+                "signRate": columns.sign_rate[index]
+            } for index in at_risk[:risk_limit]]
+        },
+        "daily": {
+            "signed": signed,
+            "makeup": makeup,
+            "missed": missed,
+            "estimatedPoints": points
+        },
+        "blindBox": {
+            "total": sum(columns.box_total),
+            "opened": sum(columns.box_opened),
+            "unopened": sum(columns.box_unopened),
+            "openedThisRun": sum(columns.box_opened_now)
+        },
+        "rights": dict(zip(RIGHTS_OUTCOMES, outcomes))
+    }
+
+
+def load_results(path):
+    """读取 fleet-results.jsonl，文件不存在时返回空列表"""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+    except OSError:
+        pass
+    return records
+
+
+def load_accounts(writer, month):
+    """读取索引中全部账号的概览分片，报表月份的概览附带当月签到记录"""
+    accounts = {}
+    for account in writer.load_summary()["accounts"]:
+        entry = writer.account_summary(account)
+        if entry is None:
+            continue
+        if entry.get("month") == month:
+            shard = writer.read_json(f"accounts/{account}/{month}.json") or {}
+            entry = dict(entry, signRecord=shard.get("signRecord", ""))
+        accounts[account] = entry
+    return accounts
+
+
+def write_report(records=(), directory=DASHBOARD_DIR, today=None):
+    """汇总仪表盘目录中的账号概览和 worker 结果，写入 data/fleet-report.json，返回报表"""
+    writer = DashboardWriter(directory)
+    # 先写入内存中尚未落盘的索引，再读取完整的账号列表
+    writer.flush_summary()
+    month = (today or date.today()).strftime("%Y%m")
+    columns = FleetColumns.build(load_accounts(writer, month), records, month)
+    report = build_report(columns, today=today)
+    writer.write_if_changed(REPORT_FILE, report)
+    return report
+
+
+def synthetic_fleet(count, month, seed=0):
+    """生成 count 个账号的模拟概览和 worker 结果（基准测试用）"""
+    rng = random.Random(seed)
+    width = month_days(month)
+    today = min(date.today().day, width) if month == date.today().strftime("%Y%m") else width
+    accounts, records = {}, []
+    for index in range(count):
+        key = f"{index:016x}"
+        record = "".join(rng.choice("1112220") for _ in range(today)) + "n" * (width - today)
+        signed, makeup = record.count("1"), record.count("2")
+        accounts[key] = {
+            "month": month,
+            "signRecord": record,
+            "signStats": {"totalDays": width, "signedDays": signed, "makeupDays": makeup,
+                          "missedDays": width - signed - makeup,
+                          "signRate": round((signed + makeup) / width * 100, 1)},
+            "pointReward": rng.choice((1, 2)),
+            "memberReward": rng.choice((0, 7)),
+            "continuousDays": rng.randrange(0, 30),
+            "months": [month]
+        }
+        opened = rng.randrange(0, 3)
+        records.append({
+            "account": f"account-{index + 1}",
+            "accountKey": key,
+            "success": rng.random() > 0.02,
+            "tasks": {
+                "sign_in": {"status": "success"},
+                "blind_box": {"status": "success", "data": {"totalCount": 10, "openedCount": 8,
+                                                             "unopenedCount": 2 - opened, "opened": opened}},
+                "rights": {"status": rng.choice(("success", "success", "failed")),
+                           "data": {"outcome": rng.choice(("received", "already_received"))}}
+            }
+        })
+    return accounts, records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途多账号汇总报表")
+    parser.add_argument("--data", default=DASHBOARD_DIR, help="仪表盘数据目录")
+    parser.add_argument("--results", default="fleet-results.jsonl", help="多账号执行结果文件")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="用 N 个模拟账号测试报表生成耗时，不读写文件")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        month = datetime.now().strftime("%Y%m")
+        accounts, records = synthetic_fleet(args.benchmark, month)
+        started = time.perf_counter()
+        columns = FleetColumns.build(accounts, records, month)
+        built = time.perf_counter()
+        report = build_report(columns)
+        content = json.dumps(report, ensure_ascii=False, separators=(",", ":"))
+        finished = time.perf_counter()
+        print(f"{args.benchmark} 个账号: 装载 {(built - started) * 1000:.1f} 毫秒, "
+              f"汇总 {(finished - built) * 1000:.1f} 毫秒, 共 {(finished - started) * 1000:.1f} 毫秒, "
+              f"报表 {len(content)} 字节")
+    else:
+        report = write_report(load_results(args.results), directory=args.data)
+        totals = report["totals"]
+        print(f"报表已写入 {os.path.join(args.data, REPORT_FILE)}: {totals['accounts']} 个账号, "
+              f"今日已签到 {totals['signedToday']}, 连续签到可能中断 {report['streakAtRisk']['count']}")
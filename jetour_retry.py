@@ -0,0 +1,166 @@
+import random
+import threading
+import time
+
+# 捷途重试策略
+# 区分可重试/不可重试错误，指数退避加随机抖动，按任务和整次运行限制总耗时，按接口熔断
+
+
+class RetryableError(Exception):
+    """可重试错误：网络异常、5xx、限流等稍后可能恢复的错误"""
+
+
+class FatalError(Exception):
+    """不可重试错误：token 失效、4xx、业务拒绝等重试也不会成功的错误"""
+
+
+class CircuitOpenError(RetryableError):
+    """接口熔断中，请求未发出"""
+
+
+# 可重试的 HTTP 状态码（其余 4xx 视为不可重试）
+RETRYABLE_HTTP_STATUSES = {408, 425, 429}
+
+
+def is_retryable(error):
+    """判断异常是否值得重试"""
+    if isinstance(error, FatalError):
+        return False
+    if isinstance(error, RetryableError):
+        return True
+    # 在这里导入 requests：只用到异常模型的脚本（如只读缓存的提取）不加载 HTTP 库
+    import requests
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status in RETRYABLE_HTTP_STATUSES
+    # 连接失败、超时、响应体解析失败以及未分类的异常沿用原来的重试行为
+    return True
+
+
+class Deadline:
+    """时间预算，seconds 为 None 表示不限制"""
+
+    def __init__(self, seconds=None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+class RetryPolicy:
+    """重试策略
+
+    max_retries: 最多尝试次数（含第一次）
+    base_delay / max_delay: 指数退避的起始和最大等待秒数
+    jitter: 抖动比例，实际等待在 [delay * (1 - jitter), delay] 之间随机
+    task_budget: 单个任务（含全部重试）的总时间预算，秒
+    """
+
+    def __init__(self, max_retries=3, base_delay=5, max_delay=120, jitter=0.5, task_budget=300):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.task_budget = task_budget
+
+    def backoff(self, attempt):
+        """第 attempt 次失败后的等待秒数"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(delay * (1 - self.jitter), delay)
+
+    def call(self, func, run_deadline=None, on_retry=None, stop_event=None):
+        """按策略执行 func
+
+        不可重试错误、次数用尽或等待会超出任务/运行预算时直接抛出最后一次的异常。
+        等待只占用当前线程，stop_event 被设置时提前结束等待并放弃重试。
+        """
+        task_deadline = Deadline(self.task_budget)
+        attempt = 0
+
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                attempt += 1
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+
+                wait_time = self.backoff(attempt)
+                budgets = [d.remaining() for d in (task_deadline, run_deadline) if d is not None]
+                budgets = [b for b in budgets if b is not None]
+                if budgets and wait_time >= min(budgets):
+                    raise
+
+                if on_retry:
+                    on_retry(attempt, e, wait_time)
+
+                if stop_event is not None:
+                    if stop_event.wait(wait_time):
+                        raise
+                else:
+                    time.sleep(wait_time)
+
+
+class CircuitBreaker:
+    """单个接口的熔断器
+
+    连续失败 failure_threshold 次后熔断 reset_timeout 秒，期间请求直接失败；
+    到期后放行一次试探请求，成功则恢复，失败则继续熔断。
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self, endpoint=""):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError(f"接口熔断中: {endpoint}")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """请求以不计入熔断的异常结束时释放试探名额，否则熔断器会一直停在半开状态"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    """按接口路径管理熔断器，多账号共享同一份状态"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint):
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[endpoint] = breaker
+            return breaker
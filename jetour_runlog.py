@@ -0,0 +1,177 @@
+import argparse
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# 捷途运行日志
+# 每个事件一行 JSON，缓冲追加写入，按日期和大小轮转；读取时逐行流式处理，不整体载入内存
+
+DEFAULT_LOG_DIR = os.environ.get("JETOUR_LOG_DIR", "logs")
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+# 日志级别以整数记录，节省空间也便于按级别过滤
+LEVELS = {"DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+class JsonlRunLog:
+    """JSONL 运行日志
+
+    事件格式：{"t": 秒级时间戳, "l": 级别, "a": 账号, "k": 任务, "m": 消息}，空字段省略。
+    当前文件为 <prefix>-<日期>.jsonl，超过 max_bytes 时改名为 <prefix>-<日期>.<序号>.jsonl 后新开文件。
+    ERROR 事件立即刷盘，其余事件在缓冲区满或 flush/close 时写入。
+    """
+
+    def __init__(self, directory=DEFAULT_LOG_DIR, prefix="auto-worker", max_bytes=DEFAULT_MAX_BYTES,
+                 buffer_size=DEFAULT_BUFFER_SIZE):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._file = None
+        self._day = None
+        self._size = 0
+
+    @property
+    def path(self):
+        day = self._day or datetime.now().strftime("%Y%m%d")
+        return os.path.join(self.directory, f"{self.prefix}-{day}.jsonl")
+
+    def _open(self, day):
+        os.makedirs(self.directory, exist_ok=True)
+        self._day = day
+        self._file = open(self.path, "a", encoding="utf-8", buffering=self.buffer_size)
+        self._size = self._file.tell()
+
+    def _rotate_by_size(self):
+        self._file.close()
+        sequence = 1
+        while os.path.exists(os.path.join(self.directory, f"{self.prefix}-{self._day}.{sequence}.jsonl")):
+            sequence += 1
+        os.replace(self.path, os.path.join(self.directory, f"{self.prefix}-{self._day}.{sequence}.jsonl"))
+        self._open(self._day)
+
+    def write(self, level, message, account=None, task=None):
+        """追加一条事件"""
+        now = time.time()
+        record = {"t": round(now, 3), "l": LEVELS.get(level, LEVELS["INFO"])}
+        if account:
+            record["a"] = account
+        if task:
+            record["k"] = task
+        record["m"] = message
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+        with self._lock:
+            day = datetime.fromtimestamp(now).strftime("%Y%m%d")
+            if self._file is None or day != self._day:
+                if self._file is not None:
+                    self._file.close()
+                self._open(day)
+            elif self._size >= self.max_bytes:
+                self._rotate_by_size()
+
+            self._file.write(line)
+            self._size += len(line.encode("utf-8"))
+            if record["l"] >= LEVELS["ERROR"]:
+                self._file.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_default_run_log = None
+_default_run_log_lock = threading.Lock()
+
+
+def get_default_run_log():
+    """获取进程内共享的默认运行日志（进程退出时自动刷盘）"""
+    global _default_run_log
+    with _default_run_log_lock:
+        if _default_run_log is None:
+            _default_run_log = JsonlRunLog()
+            atexit.register(_default_run_log.close)
+        return _default_run_log
+
+
+def log_files(directory=DEFAULT_LOG_DIR, prefix="auto-worker", day=None):
+    """列出日志文件，day 为 %Y%m%d 时只列出当天的文件（含轮转文件）"""
+    pattern = f"{prefix}-{day}*.jsonl" if day else f"{prefix}-*.jsonl"
+    return sorted(glob.glob(os.path.join(directory, pattern)))
+
+
+def iter_events(paths, min_level=None, account=None, since=None):
+    """逐行读取事件
+
+    min_level: 最低级别名称（如 "ERROR"）；account: 只看某个账号；since: 起始时间戳。
+    """
+    min_value = LEVELS.get(min_level, 0) if min_level else 0
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 进程中断可能留下不完整的最后一行
+                    continue
+                if record.get("l", 0) < min_value:
+                    continue
+                if account and record.get("a") != account:
+                    continue
+                if since and record.get("t", 0) < since:
+                    continue
+                yield record
+
+
+def aggregate(paths):
+    """流式汇总：事件总数、各级别数量、各账号各级别数量、时间范围"""
+    summary = {"events": 0, "by_level": {}, "by_account": {}, "first": None, "last": None}
+    for record in iter_events(paths):
+        level = LEVEL_NAMES.get(record.get("l"), str(record.get("l")))
+        summary["events"] += 1
+        summary["by_level"][level] = summary["by_level"].get(level, 0) + 1
+        account_levels = summary["by_account"].setdefault(record.get("a") or "-", {})
+        account_levels[level] = account_levels.get(level, 0) + 1
+        timestamp = record.get("t")
+        if timestamp is not None:
+            summary["first"] = timestamp if summary["first"] is None else min(summary["first"], timestamp)
+            summary["last"] = timestamp if summary["last"] is None else max(summary["last"], timestamp)
+    return summary
+
+
+def format_event(record):
+    timestamp = datetime.fromtimestamp(record.get("t", 0)).strftime("%Y-%m-%d %H:%M:%S")
+    level = LEVEL_NAMES.get(record.get("l"), str(record.get("l")))
+    prefix = "".join(f" [{record[key]}]" for key in ("a", "k") if record.get(key))
+    return f"[{timestamp}] [{level}]{prefix} {record.get('m', '')}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途运行日志查看")
+    parser.add_argument("command", choices=["tail", "summary"], help="tail: 输出事件；summary: 汇总统计")
+    parser.add_argument("--dir", default=DEFAULT_LOG_DIR, help="日志目录")
+    parser.add_argument("--day", help="只看某天的日志，格式 %%Y%%m%%d")
+    parser.add_argument("--level", help="tail 的最低级别，如 ERROR")
+    parser.add_argument("--account", help="tail 只看某个账号")
+    args = parser.parse_args()
+
+    files = log_files(args.dir, day=args.day)
+    if args.command == "tail":
+        for event in iter_events(files, min_level=args.level, account=args.account):
+            print(format_event(event))
+    else:
+        print(json.dumps(aggregate(files), ensure_ascii=False, indent=2))
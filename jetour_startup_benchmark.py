@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from jetour import SUBCOMMAND_MODULES
+
+# 捷途命令行启动时间基准测试
+# 每次在新的解释器中导入 jetour 和子命令需要的模块：分别测量总耗时和 -X importtime 统计的导入耗时，
+# 并列出导入了哪些重模块。冷启动在每个账号、每次定时运行都要付出一次
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 只应在确实需要时才导入的模块
+HEAVY_MODULES = ("requests", "urllib3", "yaml", "numpy", "http.server")
+
+
+def _import_code(command):
+    if command is None:
+        return "import jetour"
+    modules = ", ".join(SUBCOMMAND_MODULES[command])
+    return f"import jetour; import {modules}"
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 (总导入微秒, {模块: 累计微秒}, [(顶层模块, 累计微秒)])"""
+    total = 0
+    cumulative = {}
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            # 表头
+            continue
+        module = name.strip()
+        total += int(self_us)
+        cumulative[module] = int(cumulative_us)
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level.append((module, int(cumulative_us)))
+    return total, cumulative, top_level
+
+
+def measure(command, repeat=5, python=sys.executable):
+    """测量一个子命令（None 表示只导入 jetour，即 --help 的开销）的启动耗时，取中位数"""
+    code = _import_code(command)
+    walls, imports = [], []
+    cumulative, top_level = {}, []
+    # 先执行一次，生成 .pyc，避免首次编译计入结果
+    subprocess.run([python, "-c", code], cwd=BASE_DIR, check=True)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([python, "-c", code], cwd=BASE_DIR, check=True)
+        walls.append(time.perf_counter() - started)
+
+        result = subprocess.run([python, "-X", "importtime", "-c", code], cwd=BASE_DIR, check=True,
+                                capture_output=True, text=True)
+        total, cumulative, top_level = parse_importtime(result.stderr)
+        imports.append(total / 1e6)
+
+    return {
+        "command": command or "--help",
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(statistics.median(imports) * 1000, 1),
+        "modules": len(cumulative),
+        "heavy": [module for module in HEAVY_MODULES if module in cumulative],
+        "slowest": [(module, round(us / 1000, 1)) for module, us in sorted(top_level, key=lambda item: -item[1])[:3]]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="捷途命令行启动时间基准测试（每个子命令的导入耗时）")
+    parser.add_argument("commands", nargs="*", metavar="command",
+                        help=f"要测量的子命令（{' / '.join(sorted(SUBCOMMAND_MODULES))}），默认全部")
+    parser.add_argument("--repeat", type=int, default=5, help="每个子命令重复次数，结果取中位数")
+    parser.add_argument("--output", help="结果另存为 JSON 文件，便于跨版本对比")
+    parser.add_argument("--max-ms", type=float, help="任一子命令的导入耗时超过该值时以非零状态退出")
+    args = parser.parse_args()
+    unknown = [command for command in args.commands if command not in SUBCOMMAND_MODULES]
+    if unknown:
+        parser.error(f"未知的子命令: {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    interpreter = (time.perf_counter() - started) / args.repeat * 1000
+
+    print(f"Python {sys.version.split()[0]}，空解释器启动 {interpreter:.1f} 毫秒")
+    print(f"{'子命令':<10} {'总耗时(ms)':>10} {'导入(ms)':>9} {'模块数':>6}  {'重模块':<24} 最慢的顶层导入(ms)")
+    reports = []
+    for command in [None] + (args.commands or sorted(SUBCOMMAND_MODULES)):
+        report = measure(command, repeat=args.repeat)
+        reports.append(report)
+        slowest = ", ".join(f"{module} {ms}" for module, ms in report["slowest"])
+        print(f"{report['command']:<10} {report['wall_ms']:>10} {report['import_ms']:>9} {report['modules']:>6}  "
+              f"{','.join(report['heavy']) or '-':<24} {slowest}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "interpreter_ms": round(interpreter, 1),
+                       "commands": reports}, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.output}")
+
+    if args.max_ms is not None:
+        slow = [report["command"] for report in reports if report["import_ms"] > args.max_ms]
+        if slow:
+            print(f"导入耗时超过 {args.max_ms} 毫秒: {', '.join(slow)}")
+            sys.exit(1)
@@ -0,0 +1,174 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# 捷途任务图执行器
+# 任务声明依赖关系，互不依赖的任务并发执行；每个任务单独计时、单独超时，一个任务失败只影响依赖它的任务
+# 线程无法强制中断：任务超时后设置它的停止事件（current_stop_event()），由任务自己在重试等待、
+# 循环间隔处检查并尽早结束
+
+SUCCESS = "success"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+
+_current = threading.local()
+
+
+def current_stop_event():
+    """当前线程所执行任务的停止事件（任务超时或运行预算用完时被设置），不在任务图中执行时返回 None"""
+    return getattr(_current, "stop_event", None)
+
+
+class Task:
+    """任务定义
+
+    requires: 必须成功完成的前置任务，任一失败则本任务跳过
+    after: 只要求先执行完（无论成败）的前置任务，用于只需保证顺序的情况；
+        前置任务超时但线程仍在执行时继续等待它真正结束（运行预算用完则跳过本任务）
+    timeout: 单个任务的超时（秒），None 表示不限
+    """
+
+    def __init__(self, name, func, requires=(), after=(), timeout=None):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.after = tuple(after)
+        self.timeout = timeout
+
+    @property
+    def dependencies(self):
+        return self.requires + self.after
+
+
+class TaskGraph:
+    """任务图
+
+    run() 返回 {任务名: {"status": ..., "result": ..., "error": ..., "duration": 秒}}，
+    status 为 success / failed / timeout / skipped。
+    """
+
+    def __init__(self):
+        self.tasks = {}
+
+    def add(self, name, func, requires=(), after=(), timeout=None):
+        if name in self.tasks:
+            raise ValueError(f"任务重复定义: {name}")
+        self.tasks[name] = Task(name, func, requires=requires, after=after, timeout=timeout)
+        return self
+
+    def validate(self):
+        """检查依赖的任务是否存在、是否有循环依赖"""
+        for task in self.tasks.values():
+            for dependency in task.dependencies:
+                if dependency not in self.tasks:
+                    raise ValueError(f"任务 {task.name} 依赖未定义的任务: {dependency}")
+
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"任务存在循环依赖: {name}")
+            visiting.add(name)
+            for dependency in self.tasks[name].dependencies:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.tasks:
+            visit(name)
+
+    def run(self, max_workers=None, deadline=None, on_finish=None):
+        """执行全部任务
+
+        max_workers: 同时执行的任务数上限，默认等于任务数
+        deadline: jetour_retry.Deadline，整体时间预算用完后未开始的任务跳过、执行中的任务记为超时
+        on_finish: 每个任务结束时以 (任务名, 结果) 调用
+        """
+        self.validate()
+        results = {}
+        pending = dict(self.tasks)
+        running = {}
+        # 已记为超时但线程仍在执行的任务 {future: 任务名}
+        lingering = {}
+        stop_events = {name: threading.Event() for name in self.tasks}
+
+        def finish(name, status, result=None, error=None, duration=0.0):
+            results[name] = {"status": status, "result": result, "error": error, "duration": round(duration, 3)}
+            if on_finish is not None:
+                on_finish(name, results[name])
+
+        def timed(task):
+            _current.stop_event = stop_events[task.name]
+            started = time.monotonic()
+            try:
+                return task.func(), None, time.monotonic() - started
+            except Exception as e:
+                return None, e, time.monotonic() - started
+            finally:
+                _current.stop_event = None
+
+        # 超时的任务无法强制中断，线程在后台执行完后结束；只有 after 依赖它的任务会等待，否则不阻塞本次 run 返回
+        executor = ThreadPoolExecutor(max_workers=max_workers or max(1, len(self.tasks)))
+        try:
+            while pending or running:
+                # 提交依赖已满足的任务；必需的前置任务未成功时跳过
+                for name, task in list(pending.items()):
+                    if any(dependency not in results for dependency in task.dependencies):
+                        continue
+                    del pending[name]
+                    failed = [dependency for dependency in task.requires if results[dependency]["status"] != SUCCESS]
+                    if failed:
+                        finish(name, SKIPPED, error=f"前置任务未成功: {', '.join(failed)}")
+                    elif deadline is not None and deadline.expired():
+                        finish(name, SKIPPED, error="运行时间预算已用完")
+                    elif any(dependency in lingering.values() for dependency in task.after):
+                        # 超时的前置任务仍可能在调用写接口，等它结束后再开始
+                        pending[name] = task
+                    else:
+                        limit = task.timeout
+                        remaining = deadline.remaining() if deadline is not None else None
+                        if remaining is not None:
+                            limit = remaining if limit is None else min(limit, remaining)
+                        expires = None if limit is None else time.monotonic() + limit
+                        running[executor.submit(timed, task)] = (name, time.monotonic(), expires)
+
+                blocking = [future for future, name in lingering.items()
+                            if any(name in task.after for task in pending.values())]
+                if not running and not blocking:
+                    # 已做过循环依赖检查，没有执行中的任务时也不会有等待中的任务
+                    break
+
+                expirations = [expires for _, _, expires in running.values() if expires is not None]
+                if blocking and deadline is not None and deadline.remaining() is not None:
+                    # 运行预算用完时醒来跳过仍在等待的任务
+                    expirations.append(time.monotonic() + deadline.remaining())
+                timeout = max(0.0, min(expirations) - time.monotonic()) if expirations else None
+                done, _ = wait(list(running) + blocking, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    if future in lingering:
+                        # 超时任务的线程已结束，结果仍记为超时
+                        del lingering[future]
+                        continue
+                    name, _, _ = running.pop(future)
+                    result, error, duration = future.result()
+                    if error is None:
+                        finish(name, SUCCESS, result=result, duration=duration)
+                    else:
+                        finish(name, FAILED, error=str(error), duration=duration)
+
+                now = time.monotonic()
+                for future, (name, started, expires) in list(running.items()):
+                    if expires is not None and now >= expires:
+                        del running[future]
+                        stop_events[name].set()
+                        if not future.done():
+                            lingering[future] = name
+                        finish(name, TIMEOUT, error=f"执行超时（{now - started:.1f}秒）", duration=now - started)
+        finally:
+            executor.shutdown(wait=False)
+
+        return results
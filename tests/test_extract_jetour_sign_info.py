@@ -0,0 +1,61 @@
+import json
+
+from extract_jetour_sign_info import JetourSignInfoExtractor
+
+TASK_INFO = {"id": 3439799346990943525, "name": "签到", "joinCount": 10, "taskRuleDesc": "<p>规则</p>",
+             "typeId": 7, "terminalList": ["app"], "validityPeriodFlag": 1, "operatorId": "op-1"}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+class RoutedHttp:
+    """按接口路径结尾返回固定的响应体"""
+
+    def __init__(self, routes):
+        self.routes = routes
+
+    def request(self, method, url, **kwargs):
+        path = url.split("?")[0]
+        for suffix, payload in self.routes.items():
+            if path.endswith(suffix):
+                return FakeResponse(payload)
+        raise AssertionError(f"未预期的请求: {url}")
+
+
+def extract(tmp_path, monkeypatch, sign_page):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JETOUR_CACHE_DISABLED", "1")
+    http = RoutedHttp({
+        "/tasks/load-one": {"status": 200, "data": {"taskInfo": TASK_INFO}},
+        "/sign/sign-record": {"status": 200, "data": {"month": "202610", "monthDays": 31, "signRecord": "12" + "n" * 29}},
+        "/sign/sign-page": {"status": 200, "data": sign_page},
+    })
+    return JetourSignInfoExtractor("token", "task", http_client=http).extract_key_info(output_mode="legacy")
+
+
+def test_task_info_is_written_as_returned(tmp_path, monkeypatch):
+    data = extract(tmp_path, monkeypatch, {"isSigned": True})
+
+    assert data["taskInfo"] == TASK_INFO
+    with open(tmp_path / "sign-data.json", encoding="utf-8") as f:
+        assert json.load(f)["taskInfo"]["terminalList"] == ["app"]
+
+
+def test_empty_next_stage_reward_is_skipped(tmp_path, monkeypatch, capsys):
+    data = extract(tmp_path, monkeypatch, {"isSigned": True, "nextStageReward": {}})
+
+    assert data["rewardInfo"]["nextStageReward"] == {}
+    assert "下一阶段奖励" not in capsys.readouterr().out
+
+
+def test_next_stage_reward_is_reported(tmp_path, monkeypatch, capsys):
+    data = extract(tmp_path, monkeypatch, {"isSigned": True, "nextStageReward": {"needContinuousDays": 3}})
+
+    assert data["rewardInfo"]["nextStageReward"]["needContinuousDays"] == 3
+    assert "需要连续签到: 3天" in capsys.readouterr().out
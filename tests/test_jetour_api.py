@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from jetour_api import JetourApi, RequestTemplate, compile_value, load_templates, render_value
+from jetour_cache import ResponseCache
+from jetour_profile import AccountProfileStore
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeHttp:
+    """记录请求地址，按主机返回不同的签到记录"""
+
+    def __init__(self):
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse({"status": 200, "data": {"host": url.split("/")[2]}})
+
+
+def make_api(cache, base_url=None):
+    return JetourApi({"JETOUR_ACCESS_TOKEN": "token", "JETOUR_TASK_ID": "task"}, http_client=FakeHttp(),
+                     cache=cache, base_url=base_url)
+
+
+def test_base_url_responses_do_not_share_the_permanent_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("JETOUR_API_BASE_URL", raising=False)
+    cache = ResponseCache(str(tmp_path), enabled=True)
+    mock = make_api(cache, base_url="http://127.0.0.1:8080")
+    real = make_api(cache)
+
+    assert mock.sign_record(params={"monthInYear": "202001"})["data"]["host"] == "127.0.0.1:8080"
+    # 已结束月份永久缓存，但模拟服务的响应不能返回给正式接口
+    assert real.sign_record(params={"monthInYear": "202001"})["data"]["host"] == "mobile-consumer.jetour.com.cn"
+    assert len(real.http.urls) == 1
+
+    # 各自的缓存照常命中
+    mock.sign_record(params={"monthInYear": "202001"})
+    real.sign_record(params={"monthInYear": "202001"})
+    assert len(mock.http.urls) == 1 and len(real.http.urls) == 1
+
+
+def test_profiles_are_kept_apart_by_origin(tmp_path):
+    store = AccountProfileStore(str(tmp_path / "profiles.json"), enabled=True)
+    store.put("token", {"cardAccountList": [{"id": "mock-card"}]}, origin="http://127.0.0.1:8080")
+
+    assert store.get("token") is None
+    assert store.get("token", origin="http://127.0.0.1:8080")["cardAccountId"] == "mock-card"
+
+    store.put("token", {"cardAccountList": [{"id": "real-card"}]})
+    store.invalidate("token", origin="http://127.0.0.1:8080")
+    assert store.get("token")["cardAccountId"] == "real-card"
+
+
+CONFIG = """
+rest_command:
+  jetour_demo:
+    url: https://mobile-consumer.jetour.com.cn/web/demo
+    method: post
+    params:
+      access_token: "${{ JETOUR_ACCESS_TOKEN || 'your-access-token' }}"
+      cardAccountId: "${{ JETOUR_CARD_ACCOUNT_ID || 'your-card-account-id' }}"
+      monthInYear: "${{ now().strftime('%Y%m') }}"
+      pageSize: 10
+    headers:
+      Host: "mobile-consumer.jetour.com.cn"
+      Accept: "*/*"
+    data:
+      rightsId: "${{ JETOUR_RIGHTS_ID }}"
+      nested:
+        code: "${{ JETOUR_RIGHTS_CODE || 'code' }}"
+        fixed: 1
+"""
+
+
+@pytest.fixture
+def demo_template(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(CONFIG, encoding="utf-8")
+    return load_templates(str(config), cache_path=str(tmp_path / "compiled.json"))["jetour_demo"]
+
+
+def test_compile_value_kinds():
+    assert compile_value("plain") == ["lit", "plain"]
+    assert compile_value(3) == ["lit", 3]
+    assert compile_value("${{ JETOUR_TASK_ID || 'your-task-id' }}") == ["var", "JETOUR_TASK_ID"]
+    assert compile_value("${{ now().strftime('%Y') }}") == ["now", "%Y"]
+    assert compile_value({"a": "${{ X }}"}) == ["dict", {"a": ["var", "X"]}]
+    with pytest.raises(ValueError):
+        compile_value("${{ os.system('x') }}")
+
+
+def test_unbound_variables_are_not_sent():
+    # || 后的默认值只是文档占位，不会被发送
+    assert render_value(["dict", {"a": ["var", "A"], "b": ["lit", 1]}], {"A": ""}) == {"b": 1}
+
+
+def test_build_renders_params_headers_and_body(demo_template):
+    kwargs = demo_template.build({"JETOUR_ACCESS_TOKEN": "token", "JETOUR_RIGHTS_ID": "r1"},
+                                 params={"pageSize": "20"})
+
+    assert demo_template.method == "POST"
+    assert kwargs["params"] == {"access_token": "token", "pageSize": "20",
+                                "monthInYear": datetime.now().strftime("%Y%m")}
+    # Host 由 requests 按 URL 设置
+    assert kwargs["headers"] == {"Accept": "*/*"}
+    assert kwargs["json"] == {"rightsId": "r1", "nested": {"fixed": 1}}
+
+
+def test_compiled_cache_round_trip(tmp_path, demo_template):
+    compiled = json.loads((tmp_path / "compiled.json").read_text(encoding="utf-8"))
+    restored = RequestTemplate.from_compiled("jetour_demo", compiled["templates"]["jetour_demo"])
+    variables = {"JETOUR_ACCESS_TOKEN": "token", "JETOUR_CARD_ACCOUNT_ID": "card", "JETOUR_RIGHTS_CODE": "c"}
+    assert restored.build(variables) == demo_template.build(variables)
+
+
+def test_unknown_endpoint_is_rejected(tmp_path, demo_template):
+    api = JetourApi(config_path=str(tmp_path / "config.yaml"), http_client=FakeHttp(), cache=False)
+    with pytest.raises(ValueError):
+        api.call("jetour_missing")
+    with pytest.raises(AttributeError):
+        api.missing
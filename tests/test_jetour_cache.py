@@ -0,0 +1,65 @@
+import os
+import time
+from datetime import datetime
+
+import jetour_cache
+from jetour_cache import PERMANENT, ResponseCache, resolve_ttl, token_hash
+
+SPEC = {"ttl": 600, "immutable_month_param": "monthInYear"}
+NOW = datetime(2026, 10, 17)
+
+
+def test_resolve_ttl():
+    assert resolve_ttl(None, {}) is None
+    assert resolve_ttl(SPEC, {"monthInYear": "202609"}, now=NOW) == PERMANENT
+    # 当月和未来月份的数据还会变化
+    assert resolve_ttl(SPEC, {"monthInYear": "202610"}, now=NOW) == 600
+    assert resolve_ttl(SPEC, {}, now=NOW) == 600
+    assert resolve_ttl({"immutable_month_param": "monthInYear"}, {"monthInYear": "202610"}, now=NOW) is None
+
+
+def test_key_hides_the_token_and_ignores_param_order(tmp_path):
+    cache = ResponseCache(str(tmp_path), enabled=True)
+    key = cache.make_key("jetour_sign_record", {"access_token": "secret", "a": 1, "b": 2})
+    assert key == cache.make_key("jetour_sign_record", {"b": 2, "a": 1, "access_token": "secret"})
+    assert key != cache.make_key("jetour_sign_record", {"access_token": "other", "a": 1, "b": 2})
+    cache.put(key, {"status": 200}, PERMANENT)
+    content = open(cache._path(key), encoding="utf-8").read()
+    assert "secret" not in content and token_hash("secret") != "secret"
+
+
+def test_entries_expire(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), enabled=True)
+    cache.put("aa1", {"v": 1}, 60)
+    cache.put("aa2", {"v": 2}, PERMANENT)
+    assert cache.get("aa1") == {"v": 1}
+
+    later = time.time() + 3600
+    monkeypatch.setattr(jetour_cache.time, "time", lambda: later)
+    assert cache.get("aa1") is None
+    assert not os.path.exists(cache._path("aa1"))
+    assert cache.get("aa2") == {"v": 2}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    payload = {"data": "x" * 900}
+    cache = ResponseCache(str(tmp_path), max_bytes=3500, enabled=True)
+    for index, key in enumerate(("k1", "k2", "k3")):
+        cache.put(key, payload, PERMANENT)
+        os.utime(cache._path(key), (1000 + index, 1000 + index))
+    # 读取 k1 使它成为最近使用的条目
+    assert cache.get("k1") == payload
+
+    cache.put("k4", payload, PERMANENT)
+
+    assert cache.get("k2") is None
+    assert cache.get("k1") == payload and cache.get("k4") == payload
+    assert cache._total_bytes <= 3500 * 0.8
+
+
+def test_disabled_cache_stores_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv("JETOUR_CACHE_DISABLED", "1")
+    cache = ResponseCache(str(tmp_path))
+    cache.put("k1", {"v": 1}, PERMANENT)
+    assert cache.get("k1") is None
+    assert os.listdir(tmp_path) == []
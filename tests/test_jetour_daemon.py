@@ -0,0 +1,106 @@
+from datetime import datetime
+
+import pytest
+
+from jetour_cache import token_hash
+from jetour_daemon import BEIJING, JetourDaemon, account_offset, next_slot, parse_schedule, previous_slot
+
+SCHEDULE = parse_schedule("10:00, 00:00")
+
+
+def beijing(*args):
+    return datetime(*args, tzinfo=BEIJING)
+
+
+def test_parse_schedule():
+    assert SCHEDULE == [(0, 0), (10, 0)]
+    assert parse_schedule("08:30,08:30") == [(8, 30)]
+    for text in ("24:00", "10:60", "", "10"):
+        with pytest.raises(ValueError):
+            parse_schedule(text)
+
+
+@pytest.mark.parametrize("now, expected", [
+    (beijing(2026, 10, 17, 9, 59), beijing(2026, 10, 17, 10, 0)),
+    # 正好在时段开始时刻，下一个时段是之后的那个
+    (beijing(2026, 10, 17, 10, 0), beijing(2026, 10, 18, 0, 0)),
+    (beijing(2026, 12, 31, 23, 0), beijing(2027, 1, 1, 0, 0)),
+])
+def test_next_slot(now, expected):
+    assert next_slot(SCHEDULE, now) == expected
+
+
+@pytest.mark.parametrize("now, expected", [
+    (beijing(2026, 10, 17, 10, 0), beijing(2026, 10, 17, 10, 0)),
+    (beijing(2026, 10, 17, 9, 59), beijing(2026, 10, 17, 0, 0)),
+    (beijing(2026, 1, 1, 0, 0), beijing(2026, 1, 1, 0, 0)),
+])
+def test_previous_slot(now, expected):
+    assert previous_slot(SCHEDULE, now) == expected
+
+
+def test_previous_slot_crosses_midnight():
+    assert previous_slot([(10, 0)], beijing(2026, 3, 1, 9, 0)) == beijing(2026, 2, 28, 10, 0)
+
+
+def test_account_offset_is_stable_within_a_slot_and_inside_the_window():
+    slot = "2026-10-17T10:00+08:00"
+    offsets = [account_offset(f"account-{index}", slot, 120) for index in range(200)]
+    assert all(0 <= offset < 120 for offset in offsets)
+    assert offsets == [account_offset(f"account-{index}", slot, 120) for index in range(200)]
+    # 不同时段的顺序不同，账号在窗口内分散
+    assert offsets != [account_offset(f"account-{index}", "2026-10-18T00:00+08:00", 120) for index in range(200)]
+    assert max(offsets) - min(offsets) > 60
+    assert account_offset("account-0", slot, 0) == 0.0
+
+
+def test_pending_accounts_survive_a_restart(tmp_path):
+    accounts = [{"name": name, "access_token": f"token-{name}", "task_id": "task"} for name in "abc"]
+    state_file = str(tmp_path / "state.json")
+    slot = "2026-10-17T10:00+08:00"
+
+    daemon = JetourDaemon(accounts, state_file=state_file)
+    daemon.state["slots"][slot] = {"started": 0, "accounts": {token_hash("token-b"): {"success": True}}}
+    daemon.save_state()
+
+    restarted = JetourDaemon(accounts, state_file=state_file)
+    assert [account["name"] for account in restarted.pending_accounts(slot)] == ["a", "c"]
+    assert len(restarted.pending_accounts("2026-10-18T00:00+08:00")) == 3
+
+
+def test_catch_up_report_includes_accounts_finished_before_the_restart(tmp_path, monkeypatch):
+    import jetour_daemon
+
+    accounts = [{"name": name, "access_token": f"token-{name}", "task_id": "task"} for name in "abc"]
+    reports = []
+    monkeypatch.setattr(jetour_daemon, "write_report", lambda records: reports.append(records))
+    monkeypatch.setattr(jetour_daemon, "export_metrics", lambda **kwargs: None)
+    # 时段都已开始，run_slot 不需要等待
+    slot = beijing(2026, 10, 16, 10, 0)
+
+    def run_account(account):
+        return {"account": account["name"], "accountKey": token_hash(account["access_token"]),
+                "success": True, "error": None}
+
+    def make_daemon():
+        daemon = JetourDaemon(accounts, window=0, state_file=str(tmp_path / "state.json"),
+                              results_file=str(tmp_path / "results.jsonl"))
+        monkeypatch.setattr(daemon.runner, "run_account", run_account)
+        return daemon
+
+    # 中断前只完成了账号 b
+    first = make_daemon()
+    first.run_slot(slot)
+    first.state["slots"][slot.isoformat(timespec="minutes")]["accounts"].pop(token_hash("token-a"))
+    first.state["slots"][slot.isoformat(timespec="minutes")]["accounts"].pop(token_hash("token-c"))
+    first.save_state()
+
+    restarted = make_daemon()
+    assert [record["account"] for record in restarted.run_slot(slot, catching_up=True)] == ["a", "c"]
+    assert sorted(record["account"] for record in reports[-1]) == ["a", "b", "c"]
+
+    # 新时段只汇总新时段的记录
+    restarted.run_slot(beijing(2026, 10, 17, 0, 0))
+    assert len(reports[-1]) == 3
+    assert {record["slot"] for record in restarted.slot_records("2026-10-17T00:00+08:00")} == {"2026-10-17T00:00+08:00"}
+    assert len(open(tmp_path / "results.jsonl", encoding="utf-8").readlines()) == 3
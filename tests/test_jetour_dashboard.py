@@ -0,0 +1,60 @@
+import json
+from datetime import date
+
+from jetour_dashboard import DashboardWriter
+from jetour_report import write_report
+
+
+def extracted(signed_days):
+    return {
+        "timestamp": "2026-10-17T10:00:00",
+        "signRecord": "1" * signed_days + "0" + "n" * (30 - signed_days),
+        "signStats": {"totalDays": 31, "signedDays": signed_days, "makeupDays": 0,
+                      "missedDays": 31 - signed_days, "signRate": round(signed_days / 31 * 100, 1)},
+        "rewardInfo": {"pointReward": 1, "memberReward": 0, "continuousDays": signed_days}
+    }
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_summary_is_a_small_index(tmp_path):
+    writer = DashboardWriter(str(tmp_path))
+    for index, account in enumerate(["aaaa", "bbbb", "cccc"]):
+        writer.write(account, extracted(10 + index), month="202610")
+    writer.flush_summary()
+
+    summary = read(tmp_path / "summary.json")
+    assert summary["accounts"] == ["aaaa", "bbbb", "cccc"]
+    assert summary["defaultAccount"] == "aaaa"
+    assert summary["default"]["signStats"]["signedDays"] == 10
+    assert "signRecord" not in summary["default"]
+
+    account = read(tmp_path / "accounts" / "bbbb" / "summary.json")
+    assert account["signStats"]["signedDays"] == 11
+    assert account["months"] == ["202610"]
+    assert "signRecord" not in account
+    assert read(tmp_path / "accounts" / "bbbb" / "202610.json")["signRecord"].startswith("1" * 11)
+
+
+def test_old_summary_format_is_migrated(tmp_path):
+    (tmp_path / "summary.json").write_text(json.dumps({
+        "accounts": {"aaaa": {"signStats": {}, "months": []}}, "lastUpdate": "x"
+    }))
+    summary = DashboardWriter(str(tmp_path)).load_summary()
+    assert summary["accounts"] == ["aaaa"]
+    assert summary["defaultAccount"] == "aaaa"
+
+
+def test_report_reads_account_shards(tmp_path):
+    writer = DashboardWriter(str(tmp_path))
+    writer.write("aaaa", extracted(16), month="202610")
+    writer.write("bbbb", extracted(17), month="202610")
+
+    report = write_report(directory=str(tmp_path), today=date(2026, 10, 17))
+    assert report["totals"]["withSignData"] == 2
+    assert report["totals"]["signedToday"] == 1
+    # aaaa 连续签到 16 天，今天（17 日）还没签
+    assert [item["account"] for item in report["streakAtRisk"]["accounts"]] == ["aaaa"]
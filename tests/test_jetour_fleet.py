@@ -0,0 +1,51 @@
+import json
+
+from jetour_fleet import JetourFleetRunner
+from jetour_mock_server import MockJetourServer
+
+
+def test_fleet_run_extracts_sign_data_for_the_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JETOUR_CACHE_DISABLED", "1")
+    accounts = [{"name": f"account-{index}", "access_token": f"fleet-token-{index}", "task_id": "task"}
+                for index in range(3)]
+
+    with MockJetourServer(unopened_boxes=0) as mock:
+        monkeypatch.setenv("JETOUR_API_BASE_URL", mock.base_url)
+        records = JetourFleetRunner(accounts, concurrency=3, result_file="fleet-results.jsonl").run()
+
+    assert all(record["extracted"] for record in records)
+    with open(tmp_path / "data" / "fleet-report.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["totals"]["accounts"] == 3
+    assert report["totals"]["withSignData"] == 3
+    assert report["totals"]["stale"] == 0
+    assert report["signRate"]["mean"] > 0
+    assert sum(report["daily"]["signed"]) > 0
+
+
+def test_no_extract_leaves_the_dashboard_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JETOUR_CACHE_DISABLED", "1")
+    accounts = [{"name": "only", "access_token": "fleet-token-x", "task_id": "task"}]
+
+    with MockJetourServer(unopened_boxes=0) as mock:
+        monkeypatch.setenv("JETOUR_API_BASE_URL", mock.base_url)
+        records = JetourFleetRunner(accounts, result_file="fleet-results.jsonl", extract=False).run()
+
+    assert not records[0]["extracted"]
+    assert not (tmp_path / "data" / "accounts").exists()
+
+
+def test_connection_pool_covers_per_account_parallel_requests(tmp_path, monkeypatch, caplog):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JETOUR_CACHE_DISABLED", "1")
+    accounts = [{"name": f"account-{index}", "access_token": f"pool-token-{index}", "task_id": "task"}
+                for index in range(16)]
+
+    with MockJetourServer(latency=0.01, unopened_boxes=0) as mock:
+        monkeypatch.setenv("JETOUR_API_BASE_URL", mock.base_url)
+        with caplog.at_level("WARNING", logger="urllib3.connectionpool"):
+            JetourFleetRunner(accounts, concurrency=4, result_file="fleet-results.jsonl").run()
+
+    assert "Connection pool is full" not in caplog.text
@@ -0,0 +1,74 @@
+from array import array
+from datetime import datetime
+
+import pytest
+
+from jetour_history import FILE_MAGIC, HEADER, SignHistoryStore
+
+ACCOUNT = "00000000000000ab"
+
+
+def test_month_saved_mid_month_is_not_final(tmp_path):
+    store = SignHistoryStore(str(tmp_path / "history.bin"))
+    store.put(ACCOUNT, "202609", "11111111111111" + "n" * 16, today=datetime(2026, 9, 15))
+    assert store.has(ACCOUNT, "202609")
+    assert not store.is_final(ACCOUNT, "202609")
+
+    # 月份结束后重新获取，记录完结，之后回填跳过
+    store.put(ACCOUNT, "202609", "1" * 30, today=datetime(2026, 10, 2))
+    assert store.is_final(ACCOUNT, "202609")
+    store.save()
+
+    reloaded = SignHistoryStore(store.path)
+    assert reloaded.is_final(ACCOUNT, "202609")
+    assert reloaded.get_record(ACCOUNT, "202609") == "1" * 30
+
+
+def test_version_1_file_loads_as_not_final(tmp_path):
+    path = tmp_path / "history.bin"
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(FILE_MAGIC, 1, 1))
+        f.write(array("Q", [int(ACCOUNT, 16)]).tobytes())
+        f.write(array("I", [202608]).tobytes())
+        f.write(array("Q", [0b01]).tobytes())
+
+    store = SignHistoryStore(str(path))
+    assert store.get_record(ACCOUNT, "202608").startswith("10")
+    assert not store.is_final(ACCOUNT, "202608")
+
+
+def test_empty_file_loads_as_empty_store(tmp_path):
+    path = tmp_path / "history.bin"
+    path.write_bytes(b"")
+    assert len(SignHistoryStore(str(path))) == 0
+
+
+def test_truncated_file_raises_value_error(tmp_path):
+    path = tmp_path / "history.bin"
+    path.write_bytes(FILE_MAGIC)
+    with pytest.raises(ValueError):
+        SignHistoryStore(str(path))
+
+    path.write_bytes(HEADER.pack(FILE_MAGIC, 2, 3) + b"\0" * 10)
+    with pytest.raises(ValueError):
+        SignHistoryStore(str(path))
+
+
+def test_stored_months_are_per_account_and_sorted(tmp_path):
+    other = "00000000000000cd"
+    store = SignHistoryStore(str(tmp_path / "history.bin"))
+    for month in ("202609", "202607", "202608"):
+        store.put(ACCOUNT, month, "1", today=datetime(2026, 10, 1))
+    store.put(other, "202608", "1", today=datetime(2026, 10, 1))
+    # 重复保存同一月份不会产生重复项
+    store.put(ACCOUNT, "202608", "2", today=datetime(2026, 10, 1))
+
+    assert store.stored_months(ACCOUNT) == ["202607", "202608", "202609"]
+    assert store.stored_months(other) == ["202608"]
+    assert store.stored_months("00000000000000ef") == []
+
+    store.save()
+    reloaded = SignHistoryStore(store.path)
+    assert reloaded.stored_months(ACCOUNT) == ["202607", "202608", "202609"]
+    reloaded.put(ACCOUNT, "202606", "1", today=datetime(2026, 10, 1))
+    assert reloaded.stored_months(ACCOUNT) == ["202606", "202607", "202608", "202609"]
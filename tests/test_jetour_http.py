@@ -0,0 +1,68 @@
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from jetour_http import JetourHttpClient
+from jetour_metrics import MetricsRegistry
+from jetour_retry import CircuitBreakerRegistry, CircuitOpenError
+
+
+class ScriptedAdapter(BaseAdapter):
+    """按顺序抛出异常或返回状态码的适配器"""
+
+    def __init__(self, outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+
+    def send(self, request, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.request = request
+        response._content = b'{"status":200}'
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(outcomes):
+    # 一次失败即熔断，立即进入半开状态
+    return JetourHttpClient(breakers=CircuitBreakerRegistry(failure_threshold=1, reset_timeout=0),
+                            metrics=MetricsRegistry(), adapter=ScriptedAdapter(outcomes))
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ChunkedEncodingError("chunked"),
+    requests.exceptions.ContentDecodingError("decoding"),
+    requests.exceptions.TooManyRedirects("redirects"),
+])
+def test_half_open_trial_released_after_non_transport_error(error):
+    client = make_client([requests.ConnectionError("down"), error, 200])
+    url = "http://jetour.test/web/task/sign/sign-page"
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(url)
+    # 半开状态的试探请求以其他异常结束
+    with pytest.raises(type(error)):
+        client.get(url)
+    # 试探名额已释放，下一次请求照常发出并恢复熔断器
+    assert client.get(url).status_code == 200
+    breaker = client.breakers.get("/web/task/sign/sign-page")
+    assert breaker.opened_at is None
+
+
+def test_half_open_trial_failure_keeps_circuit_open():
+    client = make_client([requests.ConnectionError("down"), requests.Timeout("slow")])
+    client.breakers.get("/web/x").reset_timeout = 0
+    url = "http://jetour.test/web/x"
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(url)
+    with pytest.raises(requests.Timeout):
+        client.get(url)
+    client.breakers.get("/web/x").reset_timeout = 60
+    with pytest.raises(CircuitOpenError):
+        client.get(url)
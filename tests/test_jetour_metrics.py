@@ -0,0 +1,52 @@
+import json
+
+from jetour_auto_worker import JetourAutoWorker
+from jetour_metrics import MetricsRegistry, get_default_metrics
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+class ScriptedHttp:
+    """按接口路径依次返回预设的响应体"""
+
+    def __init__(self, script):
+        self.script = {path: list(payloads) for path, payloads in script.items()}
+
+    def request(self, method, url, **kwargs):
+        path = "/" + url.split("/", 3)[3].split("?")[0]
+        return FakeResponse(self.script[path].pop(0))
+
+
+def test_prometheus_retries_are_labelled_by_endpoint():
+    registry = MetricsRegistry()
+    registry.inc_retry("/web/task/sign/sign-page")
+    registry.inc_retry("/web/task/sign/sign-page")
+
+    text = registry.render_prometheus()
+    assert 'jetour_http_retries_total{endpoint="/web/task/sign/sign-page"} 2' in text
+    assert "重试次数: /web/task/sign/sign-page=2" in registry.summary_lines()
+
+
+def test_worker_retry_is_counted_against_the_failing_endpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JETOUR_CACHE_DISABLED", "1")
+    sign_page = "/web/task/sign/sign-page"
+    http = ScriptedHttp({sign_page: [
+        {"status": 500, "message": "系统繁忙"},
+        {"status": 200, "data": {"isSigned": True}},
+    ]})
+    worker = JetourAutoWorker(access_token="token", task_id="task", card_account_id="card", http_client=http,
+                              config={"retry_base_delay": 0.001, "retry_max_delay": 0.001})
+    before = dict(get_default_metrics().retries)
+
+    assert worker.sign_in()["message"] == "今日已签到"
+
+    retries = get_default_metrics().retries
+    assert retries.get(sign_page, 0) - before.get(sign_page, 0) == 1
+    assert "sign_in" not in retries
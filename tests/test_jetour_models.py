@@ -0,0 +1,32 @@
+import pytest
+
+from jetour_models import ConsumerDetail, MalformedResponseError, NextStageReward, SignPage
+
+
+def detail(**fields):
+    data = {"id": 1, "cardAccountList": [{"id": 42}]}
+    data.update(fields)
+    return {"status": 200, "data": data}
+
+
+def test_display_only_member_fields_do_not_block_card_account_id():
+    parsed = ConsumerDetail.from_response(detail(jetourCoins="120.5", growth="10", levelOrder="x",
+                                                 mobile={"masked": True}, nextRiseValue=1000))
+    assert parsed.card_account_id == "42"
+    assert parsed.jetour_coins == 120.5
+    assert parsed.growth == 10
+    # 无法转换的值取默认值
+    assert parsed.level_order is None
+    assert parsed.mobile is None
+    assert parsed.next_rise_value == 1000
+
+
+def test_card_account_list_is_still_validated():
+    with pytest.raises(MalformedResponseError):
+        ConsumerDetail.from_response(detail(cardAccountList="42"))
+
+
+def test_empty_nested_model_is_falsy():
+    assert not NextStageReward.from_data({})
+    assert NextStageReward.from_data({"status": 0})
+    assert not SignPage.from_data({"isSigned": False, "nextStageReward": {}}).next_stage_reward
@@ -0,0 +1,60 @@
+import json
+
+import requests
+
+from jetour_mock_server import MockJetourServer
+from jetour_replay import REDACTED, RecordingAdapter, ReplayAdapter, redact
+
+TOKEN = "secret-token-123"
+
+
+def session_with(adapter):
+    session = requests.Session()
+    session.mount("http://", adapter)
+    return session
+
+
+def record(tmp_path):
+    path = str(tmp_path / "recordings" / "requests.jsonl")
+    adapter = RecordingAdapter(path)
+    with MockJetourServer() as mock:
+        session = session_with(adapter)
+        session.get(f"{mock.base_url}/web/member/consumer/detail", params={"access_token": TOKEN})
+        session.post(f"{mock.base_url}/web/member/receiveRights", params={"access_token": TOKEN},
+                     json={"cardAccountId": "card-999", "rights": [{"token": TOKEN, "id": 1}]})
+    adapter.close()
+    return path
+
+
+def test_redact_is_recursive():
+    assert redact({"access_token": "t", "a": [{"cardAccountId": 1, "b": 2}]}) == \
+        {"access_token": REDACTED, "a": [{"cardAccountId": REDACTED, "b": 2}]}
+
+
+def test_recording_never_contains_the_token(tmp_path):
+    path = record(tmp_path)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+        records = [json.loads(line) for line in text.splitlines()]
+
+    assert TOKEN not in text
+    assert "card-999" not in text
+    assert all(item["params"]["access_token"] == REDACTED for item in records)
+    assert records[1]["body"]["cardAccountId"] == REDACTED
+    assert records[1]["body"]["rights"][0]["token"] == REDACTED
+    # 响应中回显的 token（模拟服务把 token 拼进 id）也被替换
+    detail = json.loads(records[0]["response"])
+    assert detail["data"]["id"] == f"member-{REDACTED}"
+
+
+def test_replay_matches_any_token_and_reports_misses(tmp_path):
+    adapter = ReplayAdapter(record(tmp_path))
+    session = session_with(adapter)
+
+    response = session.get("http://replay.test/web/member/consumer/detail", params={"access_token": "other"})
+    assert response.status_code == 200
+    assert response.json()["data"]["levelName"] == "旅行自由客"
+
+    missing = session.get("http://replay.test/web/unknown")
+    assert missing.status_code == 404 and adapter.misses == 1
+    adapter.close()
@@ -0,0 +1,122 @@
+import pytest
+import requests
+
+from jetour_retry import (CircuitBreaker, CircuitOpenError, Deadline, FatalError, RetryableError, RetryPolicy,
+                          is_retryable)
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (FatalError("token 失效"), False),
+    (RetryableError("5xx"), True),
+    (CircuitOpenError("熔断"), True),
+    (http_error(503), True),
+    (http_error(500), True),
+    (http_error(429), True),
+    (http_error(408), True),
+    (http_error(404), False),
+    (http_error(401), False),
+    (requests.ConnectionError("down"), True),
+    (requests.Timeout("slow"), True),
+    (ValueError("bad json"), True),
+])
+def test_retry_classification(error, expected):
+    assert is_retryable(error) is expected
+
+
+def failing(errors):
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise errors.pop(0) if errors else RetryableError("again")
+    return func, calls
+
+
+def test_fatal_errors_are_not_retried():
+    func, calls = failing([FatalError("token 失效")])
+    with pytest.raises(FatalError):
+        RetryPolicy(max_retries=5, base_delay=0).call(func)
+    assert len(calls) == 1
+
+
+def test_retries_stop_after_max_attempts():
+    func, calls = failing([])
+    retries = []
+    with pytest.raises(RetryableError):
+        RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.001).call(
+            func, on_retry=lambda attempt, error, wait: retries.append(attempt))
+    assert len(calls) == 3
+    assert retries == [1, 2]
+
+
+def test_success_after_retry_returns_the_result():
+    results = [RetryableError("502"), "ok"]
+
+    def func():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    assert RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.001).call(func) == "ok"
+
+
+def test_wait_beyond_the_run_budget_is_not_attempted():
+    func, calls = failing([])
+    with pytest.raises(RetryableError):
+        # 第一次等待约 10 秒，超过剩余的运行预算，直接放弃
+        RetryPolicy(max_retries=5, base_delay=10, jitter=0).call(func, run_deadline=Deadline(1))
+    assert len(calls) == 1
+
+
+def test_wait_beyond_the_task_budget_is_not_attempted():
+    func, calls = failing([])
+    with pytest.raises(RetryableError):
+        RetryPolicy(max_retries=5, base_delay=10, jitter=0, task_budget=5).call(func)
+    assert len(calls) == 1
+
+
+def test_backoff_grows_exponentially_up_to_the_cap():
+    policy = RetryPolicy(base_delay=5, max_delay=30, jitter=0)
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [5, 10, 20, 30, 30]
+    jittered = RetryPolicy(base_delay=8, jitter=0.5).backoff(1)
+    assert 4 <= jittered <= 8
+
+
+def test_deadline():
+    assert Deadline().remaining() is None and not Deadline().expired()
+    assert Deadline(0).expired()
+    assert 0 < Deadline(60).remaining() <= 60
+
+
+def test_breaker_opens_after_threshold_and_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.before_call("/x")
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("/x")
+
+    # 熔断到期后只放行一个试探请求
+    breaker.reset_timeout = 0
+    breaker.before_call("/x")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("/x")
+
+    breaker.record_success()
+    assert breaker.opened_at is None
+    breaker.before_call("/x")
+
+
+def test_breaker_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.before_call("/x")
+    assert breaker.opened_at is None
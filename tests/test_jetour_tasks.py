@@ -0,0 +1,81 @@
+import threading
+import time
+
+from jetour_retry import Deadline, RetryableError, RetryPolicy
+from jetour_tasks import SKIPPED, SUCCESS, TIMEOUT, TaskGraph, current_stop_event
+
+
+def test_timed_out_task_stops_retrying():
+    attempts = []
+    finished = threading.Event()
+    policy = RetryPolicy(max_retries=10, base_delay=5, max_delay=5, task_budget=60)
+
+    def flaky():
+        attempts.append(time.monotonic())
+        raise RetryableError("502")
+
+    def task():
+        try:
+            return policy.call(flaky, stop_event=current_stop_event())
+        finally:
+            finished.set()
+
+    results = TaskGraph().add("sign_in", task, timeout=0.1).run()
+
+    assert results["sign_in"]["status"] == TIMEOUT
+    # 停止事件结束了重试等待，没有第二次调用
+    assert finished.wait(1)
+    assert len(attempts) == 1
+
+
+def test_after_waits_for_a_timed_out_task_to_really_finish():
+    release = threading.Event()
+    events = []
+
+    def sign_in():
+        # 模拟超时后仍在进行的写请求：停止事件只能让任务在下一个检查点结束
+        current_stop_event().wait()
+        release.wait(1)
+        events.append("sign_in done")
+
+    def blind_box():
+        events.append("blind_box start")
+        return "opened"
+
+    graph = TaskGraph()
+    graph.add("sign_in", sign_in, timeout=0.05)
+    graph.add("blind_box", blind_box, after=("sign_in",))
+    graph.add("rights", lambda: "ok", requires=("sign_in",))
+    threading.Timer(0.2, release.set).start()
+    results = graph.run()
+
+    assert results["sign_in"]["status"] == TIMEOUT
+    assert results["rights"]["status"] == SKIPPED
+    assert results["blind_box"]["status"] == SUCCESS
+    assert events == ["sign_in done", "blind_box start"]
+
+
+def test_after_is_skipped_when_the_run_budget_ends_first():
+    release = threading.Event()
+    graph = TaskGraph()
+    graph.add("sign_in", lambda: release.wait(5), timeout=0.05)
+    graph.add("blind_box", lambda: "opened", after=("sign_in",))
+
+    started = time.monotonic()
+    results = graph.run(deadline=Deadline(0.3))
+    release.set()
+
+    assert results["sign_in"]["status"] == TIMEOUT
+    assert results["blind_box"]["status"] == SKIPPED
+    assert time.monotonic() - started < 2
+
+
+def test_unrelated_timeout_does_not_block_the_run():
+    release = threading.Event()
+    started = time.monotonic()
+    results = TaskGraph().add("slow", lambda: release.wait(5), timeout=0.05).add("fast", lambda: 1).run()
+    release.set()
+
+    assert results["slow"]["status"] == TIMEOUT
+    assert results["fast"]["status"] == SUCCESS
+    assert time.monotonic() - started < 1